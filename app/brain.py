@@ -8,26 +8,92 @@ LLM-powered decision maker with:
 """
 
 import os
-import yaml
+import re
 import json
-from typing import Dict, List, Optional, Callable
-from openai import OpenAI
+import hashlib
+import logging
+import time
+from types import SimpleNamespace
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional, Callable, Tuple
 from app.router import (
-    get_openai_tools, parse_tool_call, execute_tool,
-    format_tool_result, check_approval_needed
+    get_openai_tools, parse_tool_calls, run_tool_calls,
+    format_tool_result, check_approval_needed, flush_audit
 )
 from memory.memory import (
     build_context, create_conversation, end_conversation,
-    add_message, get_conversation_messages, add_feedback,
-    DEFAULT_USER
+    add_message, add_messages_bulk, get_conversation_messages, add_feedback,
+    data_version, get_pool, DEFAULT_USER
 )
+from memory.cache import SemanticResponseCache, DEFAULT_TAU, DEFAULT_TTL_S
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+# Compact JSON for everything sent to the API or stored; orjson when present
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    def _dumps(obj) -> str:
+        return json.dumps(obj, separators=(",", ":"))
 
 POLICIES_PATH = os.path.join(os.path.dirname(__file__), "..", "configs", "policies.yaml")
 
+# Inputs too short or too generic to be worth a semantic recall
+_SKIP_PATTERNS = {
+    "hi", "hello", "ok", "okay", "thanks", "thank you", "yes", "no",
+    "yep", "nope", "sure", "cool",
+}
+_MIN_RECALL_CHARS = 12
+# Questions whose answer changes over time; never served from the response cache
+_VOLATILE_RE = re.compile(
+    r"\b(now|today|tonight|tomorrow|yesterday|time|date|day|current|currently|"
+    r"latest|recent|weather|this (week|month|year))\b", re.IGNORECASE)
+# Consecutive empty recalls before semantic lookup is paused for the conversation
+_RECALL_BREAKER_LIMIT = 5
+# Seconds before an already-injected memory may be injected again
+_REINJECT_COOLDOWN_S = 300
+# Ceiling on injected memory per turn (approx. tokens, ~4 chars each)
+_MEM_TOKEN_BUDGET = 750
+_PER_SNIPPET_TOKEN_BUDGET = 100
+# History entries before the oldest ones are summarized (see _compact_history)
+_HISTORY_COMPACT_AT = 60
+_HISTORY_COMPACT_CHUNK = 30
+# Hard cap on in-memory entries, should summarization keep failing
+_HISTORY_MAXLEN = 120
+# Entries kept verbatim when the API reports the context window is full
+_EMERGENCY_KEEP = 5
+_SUMMARY_PREFIX = "[summary of earlier turns]"
+_SUMMARY_INSTRUCTIONS = (
+    "Summarize this earlier part of a conversation between a user and the "
+    "assistant Jarvis in at most 300 tokens. Keep facts, decisions, open "
+    "tasks and tool results that later turns may rely on. Plain text only."
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _approx_tokens(text: str) -> int:
+    return len(text) // 4
+
+
+def _truncate_tokens(text: str, budget: int) -> str:
+    """Cut text to roughly `budget` tokens, marking the cut with '...'."""
+    limit = budget * 4
+    if len(text) <= limit:
+        return text
+    return text[:max(limit - 3, 0)] + "..."
+
 
 def load_brain_config() -> Dict:
+    import yaml  # deferred: only needed once, at Brain construction
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
     with open(POLICIES_PATH) as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=loader)
     return config.get("brain", {})
 
 
@@ -41,74 +107,248 @@ class Brain:
                 If None, all confirmations are auto-denied.
         """
         self.config = load_brain_config()
-        self.client = OpenAI(api_key=api_key or os.environ.get("OPENAI_API_KEY"))
+        # OpenAI client is built on first use (see `client`)
+        self._api_key = api_key
+        self._client: Optional["OpenAI"] = None
         self.model = self.config.get("model", "gpt-4o")
         self.temperature = self.config.get("temperature", 0.3)
         self.max_tokens = self.config.get("max_tokens", 2000)
+        # Run independent tool calls from one LLM response concurrently
+        self.parallel_tools = self.config.get("parallel_tools", True)
+        # Cheap model used to compact old history
+        self.summary_model = self.config.get("summary_model", "gpt-4o-mini")
         self.tools = get_openai_tools()
         self.approval_callback = approval_callback
 
         # Conversation state
         self.conversation_id: Optional[str] = None
-        self.chat_history: List[Dict] = []
+        self.chat_history: Deque[Dict] = deque(maxlen=_HISTORY_MAXLEN)
         self._last_tool_run_id: Optional[str] = None
-        self._last_message_id: Optional[str] = None
+        # Future resolving to the id; messages are written in the background
+        self._last_message_id: Optional[Future] = None
+
+        self._empty_recalls = 0
+        self._recall_disabled = False
+        # memory_id -> last injection time, for per-session dedup
+        self._injected_mem_ids: Dict[str, float] = {}
+
+        # Single writer thread so message persistence stays off the turn's
+        # critical path while keeping insert order
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jarvis-io")
+        # Overlaps build_context() with the semantic lookup when assembling prompts
+        self._prompt_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="jarvis-prompt")
+
+        # (memory data_version, rendered pack) — see _memory_pack()
+        self._cached_memory_pack: Optional[Tuple[int, str]] = None
+
+        # Semantic cache of tool-free responses, keyed on the user input embedding
+        cache_cfg = self.config.get("response_cache", {}) or {}
+        self.response_cache: Optional[SemanticResponseCache] = None
+        if cache_cfg.get("enabled", True):
+            self.response_cache = SemanticResponseCache(
+                ttl_s=cache_cfg.get("ttl_s", DEFAULT_TTL_S)
+            )
+        self.response_cache_tau = cache_cfg.get("threshold", DEFAULT_TAU)
+
+    @property
+    def client(self) -> "OpenAI":
+        if self._client is None:
+            # Imported here: openai is slow to import and slash commands never need it
+            from openai import OpenAI
+            self._client = OpenAI(api_key=self._api_key or os.environ.get("OPENAI_API_KEY"))
+        return self._client
+
+    @property
+    def vs(self):
+        """Shared vector store for the configured backend; None if unusable."""
+        from memory.vectors import get_vector_store
+        return get_vector_store()
 
     def _build_system_prompt(self) -> str:
-        base = self.config.get("system_prompt", "You are Jarvis, a helpful assistant.")
-        memory_context = build_context()
+        """Stable instructions only, so the prompt prefix stays cacheable across turns."""
+        return self.config.get("system_prompt", "You are Jarvis, a helpful assistant.")
+
+    def _memory_pack(self) -> str:
+        """
+        Render build_context() as a versioned pack. The header hash only
+        changes when the content does, and the pack is only rebuilt when
+        memory.data_version() moves, keeping the prefix cache-friendly.
+        """
+        version = data_version()
+        if self._cached_memory_pack and self._cached_memory_pack[0] == version:
+            return self._cached_memory_pack[1]
+
+        text = build_context()
+        digest = hashlib.blake2b(text.encode(), digest_size=4).hexdigest()
+        pack = f"# memory v={digest}\n{text}"
+        self._cached_memory_pack = (version, pack)
+        return pack
+
+    def _build_memory_prompt(self) -> str:
+        """
+        Per-turn memory block, sent as a separate message after the static prefix.
+        Bounded by _MEM_TOKEN_BUDGET: the memory pack is truncated first and
+        semantic snippets fill whatever budget remains.
+        """
+        # SQLite context and vector recall are independent; run them concurrently
+        pack_future = self._prompt_pool.submit(self._memory_pack)
+        semantic_future = self._prompt_pool.submit(self._get_semantic_context)
+        pack = pack_future.result()
+        snippets = semantic_future.result()
+
+        if _approx_tokens(pack) > _MEM_TOKEN_BUDGET:
+            logger.info("memory pack over budget (%d tokens), truncating", _approx_tokens(pack))
+            pack = _truncate_tokens(pack, _MEM_TOKEN_BUDGET)
+        remaining = _MEM_TOKEN_BUDGET - _approx_tokens(pack)
 
         # Try to inject semantic context
-        semantic_context = self._get_semantic_context()
+        lines = []
+        now = time.time()
+        for mem_id, line in snippets:
+            cost = _approx_tokens(line)
+            if cost > remaining:
+                logger.info("memory budget hit, dropping remaining semantic snippets")
+                break
+            remaining -= cost
+            lines.append(line)
+            self._injected_mem_ids[mem_id] = now
 
-        parts = [base, "\n## Memory Context\n" + memory_context]
-        if semantic_context:
-            parts.append("\n## Relevant Knowledge\n" + semantic_context)
+        parts = ["## Memory Context\n" + pack]
+        if lines:
+            parts.append("\n## Relevant Knowledge\n" + "\n".join(lines))
 
         return "\n".join(parts)
 
-    def _get_semantic_context(self) -> str:
-        """Pull relevant memories from vector store based on recent conversation."""
+    @staticmethod
+    def _should_recall(user_input: str) -> bool:
+        """Skip recall for greetings/acks and very short inputs."""
+        text = (user_input or "").strip().lower().rstrip("!.?")
+        if len(text) < _MIN_RECALL_CHARS:
+            return False
+        return text not in _SKIP_PATTERNS
+
+    def _get_semantic_context(self) -> List[Tuple[str, str]]:
+        """
+        Pull relevant memories from vector store based on recent conversation.
+        Returns (memory_id, rendered line) pairs, best match first.
+        """
+        if self._recall_disabled:
+            return []
         try:
-            from memory.vectors import VectorStore
-            vs = VectorStore()
-            if not vs.available:
-                return ""
+            vs = self.vs
+            if not vs or not vs.available:
+                return []
 
             # Use last few user messages as query
             user_msgs = [m["content"] for m in self.chat_history if m.get("role") == "user"]
-            if not user_msgs:
-                return ""
+            if not user_msgs or not self._should_recall(user_msgs[-1]):
+                return []
 
             query = " ".join(user_msgs[-3:])[:500]
-            results = vs.search(query, top_k=3)
+            embedding = self._embed(query)
+            if embedding is None:
+                return []
+            results = vs.search_by_vector(embedding, top_k=3)
 
             if not results:
-                return ""
+                self._note_recall(False)
+                return []
 
-            lines = []
+            snippets = []
+            relevant = False
+            now = time.time()
             for r in results:
-                if r["score"] > 0.7:  # Only high-relevance
-                    lines.append(f"- [{r['score']:.2f}] {r['text'][:200]}")
-
-            return "\n".join(lines)
+                if r["score"] <= 0.7:  # Only high-relevance
+                    continue
+                relevant = True
+                mem_id = r.get("memory_id") or r.get("chroma_id")
+                last = self._injected_mem_ids.get(mem_id)
+                if last is not None and now - last < _REINJECT_COOLDOWN_S:
+                    continue  # Already in recent context this session
+                text = _truncate_tokens(r["text"], _PER_SNIPPET_TOKEN_BUDGET)
+                snippets.append((mem_id, f"- [{r['score']:.2f}] {text}"))
+
+            self._note_recall(relevant)
+            return snippets
         except Exception:
-            return ""
+            return []
+
+    def _note_recall(self, found: bool):
+        """Circuit breaker: stop recalling after repeated empty lookups."""
+        if found:
+            self._empty_recalls = 0
+            return
+        self._empty_recalls += 1
+        if self._empty_recalls >= _RECALL_BREAKER_LIMIT:
+            self._recall_disabled = True
+
+    def _embed(self, text: str) -> Optional[List[float]]:
+        """Embed via the vector store (its shared LRU serves repeated texts)."""
+        if not self.vs or not self.vs.available:
+            return None
+        return self.vs.embed(text)
+
+    def _embed_input(self, text: str) -> Optional[List[float]]:
+        """Embed the user input for the response cache (None if not cacheable)."""
+        if self.response_cache is None or not self._cacheable(text):
+            return None
+        return self._embed(text)
+
+    def _cacheable(self, text: str) -> bool:
+        """
+        Short or generic inputs ("yes", "continue") mean something different
+        after every turn, and time-sensitive questions go stale.
+        """
+        return self._should_recall(text) and not _VOLATILE_RE.search(text)
+
+    def _response_context(self) -> str:
+        """Digest of the last assistant turn; cached answers only match the same one."""
+        for entry in reversed(self.chat_history):
+            if entry.get("role") == "assistant" and entry.get("content"):
+                return hashlib.blake2b(entry["content"].encode(), digest_size=8).hexdigest()
+        return ""
 
     def start_conversation(self, title: str = None) -> str:
         """Start a new persistent conversation."""
         self.conversation_id = create_conversation(title=title)
-        self.chat_history = []
+        self.chat_history = deque(maxlen=_HISTORY_MAXLEN)
         self._last_tool_run_id = None
         self._last_message_id = None
+        self._empty_recalls = 0
+        self._recall_disabled = False
+        self._injected_mem_ids = {}
         return self.conversation_id
 
+    def _persist_message(self, *args, **kwargs) -> Future:
+        """Queue add_message() on the IO thread; returns a Future of the message_id."""
+        future = self._io.submit(add_message, *args, **kwargs)
+        future.add_done_callback(self._report_io_error)
+        return future
+
+    def _persist_messages(self, conversation_id: str, msgs: list) -> Future:
+        """Queue add_messages_bulk() on the IO thread (one transaction)."""
+        future = self._io.submit(add_messages_bulk, conversation_id, msgs)
+        future.add_done_callback(self._report_io_error)
+        return future
+
+    @staticmethod
+    def _report_io_error(future: Future):
+        if future.exception() is not None:
+            logger.warning("persist failed", exc_info=future.exception())
+
+    def flush(self):
+        """Block until every queued message and tool-run audit has been written."""
+        self._io.submit(lambda: None).result()
+        flush_audit()
+        get_pool().flush()
+
     def end_current_conversation(self):
         """End and archive the current conversation."""
+        self.flush()
         if self.conversation_id:
             end_conversation(self.conversation_id)
         self.conversation_id = None
-        self.chat_history = []
+        self.chat_history = deque(maxlen=_HISTORY_MAXLEN)
 
     def reset_conversation(self):
         """Clear in-memory history but keep DB records."""
@@ -121,7 +361,83 @@ class Brain:
 
     @property
     def last_message_id(self) -> Optional[str]:
-        return self._last_message_id
+        if self._last_message_id is None:
+            return None
+        try:
+            return self._last_message_id.result()
+        except Exception:
+            return None
+
+    def _history_for_request(self) -> List[Dict]:
+        """
+        History as a list for the API. FIFO eviction can leave tool results
+        whose assistant tool_calls entry was dropped; the API rejects those.
+        """
+        history = list(self.chat_history)
+        start = 0
+        while start < len(history) and history[start].get("role") == "tool":
+            start += 1
+        return history[start:]
+
+    @staticmethod
+    def _render_for_summary(entries: List[Dict]) -> str:
+        lines = []
+        for m in entries:
+            role = m.get("role")
+            if m.get("tool_calls"):
+                for tc in m["tool_calls"]:
+                    fn = tc["function"]
+                    lines.append(f"assistant called {fn['name']}({fn['arguments'][:300]})")
+            elif role == "tool":
+                lines.append(f"tool result: {(m.get('content') or '')[:500]}")
+            elif role == "system":
+                lines.append(m.get("content") or "")
+            else:
+                lines.append(f"{role}: {m.get('content') or ''}")
+        return "\n".join(lines)
+
+    def _compact_history(self):
+        """
+        Once history reaches _HISTORY_COMPACT_AT entries, replace the oldest
+        _HISTORY_COMPACT_CHUNK with a single summary system message written
+        by the summary model. An earlier summary is folded into the new one.
+        If summarization fails the chunk is dropped, as plain trimming would.
+        """
+        if len(self.chat_history) < _HISTORY_COMPACT_AT:
+            return
+        history = list(self.chat_history)
+        cut = _HISTORY_COMPACT_CHUNK
+        # Don't separate a tool call from its results
+        while cut < len(history) and history[cut].get("role") == "tool":
+            cut += 1
+        old, recent = history[:cut], history[cut:]
+
+        try:
+            response = self.client.chat.completions.create(
+                model=self.summary_model,
+                messages=[
+                    {"role": "system", "content": _SUMMARY_INSTRUCTIONS},
+                    {"role": "user", "content": self._render_for_summary(old)},
+                ],
+                temperature=0,
+                max_tokens=400,
+            )
+            summary = (response.choices[0].message.content or "").strip()
+        except Exception as e:
+            logger.warning("history summarization failed, trimming instead: %s", e)
+            summary = ""
+
+        compacted = deque(maxlen=_HISTORY_MAXLEN)
+        if summary:
+            compacted.append({"role": "system", "content": f"{_SUMMARY_PREFIX}\n{summary}"})
+        compacted.extend(recent)
+        self.chat_history = compacted
+
+    def _emergency_compact(self):
+        """Keep only the last few entries after a context_length_exceeded error."""
+        self.chat_history = deque(
+            list(self.chat_history)[-_EMERGENCY_KEEP:], maxlen=_HISTORY_MAXLEN
+        )
 
     def _request_approval(self, tool_name: str, arguments: Dict) -> bool:
         """Ask user for approval on a risky tool call."""
@@ -137,144 +453,221 @@ class Brain:
 
         return self.approval_callback(prompt)
 
-    def think(self, user_input: str) -> str:
+    def _complete(self, messages: List[Dict], on_token: Callable = None):
+        """
+        One chat completion. With `on_token`, the response is streamed and
+        each content delta is passed to it as it arrives; the returned
+        object mirrors the non-streaming message (content, tool_calls).
+        """
+        kwargs = dict(
+            model=self.model, messages=messages, tools=self.tools,
+            tool_choice="auto", temperature=self.temperature,
+            max_tokens=self.max_tokens,
+        )
+        if on_token is None:
+            response = self.client.chat.completions.create(**kwargs)
+            return response.choices[0].message
+
+        content: List[str] = []
+        calls: Dict[int, Dict] = {}
+        for chunk in self.client.chat.completions.create(stream=True, **kwargs):
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if delta.content:
+                content.append(delta.content)
+                on_token(delta.content)
+            for tc in delta.tool_calls or []:
+                call = calls.setdefault(tc.index, {"id": None, "name": "", "arguments": ""})
+                if tc.id:
+                    call["id"] = tc.id
+                if tc.function and tc.function.name:
+                    call["name"] += tc.function.name
+                if tc.function and tc.function.arguments:
+                    call["arguments"] += tc.function.arguments
+
+        tool_calls = [
+            SimpleNamespace(
+                id=c["id"], type="function",
+                function=SimpleNamespace(name=c["name"], arguments=c["arguments"]),
+            )
+            for _, c in sorted(calls.items())
+        ]
+        return SimpleNamespace(content="".join(content) or None, tool_calls=tool_calls or None)
+
+    def _complete_or_compact(self, head: List[Dict], messages: List[Dict],
+                             on_token: Callable = None):
+        """
+        _complete(), retried once with emergency-compacted history if the
+        request overflows the model's context window. `messages` is rebuilt
+        in place so later tool iterations keep appending to it.
+        """
+        try:
+            return self._complete(messages, on_token)
+        except Exception as e:
+            if getattr(e, "code", None) != "context_length_exceeded":
+                raise
+            logger.warning("context length exceeded, keeping last %d history entries",
+                           _EMERGENCY_KEEP)
+            self._emergency_compact()
+            messages[:] = [*head, *self._history_for_request()]
+            return self._complete(messages, on_token)
+
+    def think(self, user_input: str, on_token: Callable = None) -> str:
         """
         Process user input through the LLM, execute tools if needed,
         and return the final response. Everything is persisted.
+
+        Args:
+            on_token: Optional Function(text_chunk). When given, responses
+                are streamed and chunks are passed through as they arrive.
+                The full text is still returned and persisted at the end.
         """
         # Ensure we have a conversation
         if not self.conversation_id:
             self.start_conversation()
 
+        # Summarize the oldest turns before the history grows unbounded
+        self._compact_history()
+
         # Persist user message
-        user_msg_id = add_message(
-            self.conversation_id, "user", user_input
-        )
+        self._persist_message(self.conversation_id, "user", user_input)
         self.chat_history.append({"role": "user", "content": user_input})
 
-        # Build messages
-        messages = [
+        # Near-duplicate of a recent tool-free turn, asked after the same
+        # assistant reply? Answer from the cache.
+        cache_context = self._response_context()
+        query_embedding = self._embed_input(user_input)
+        if query_embedding is not None:
+            try:
+                cached = self.response_cache.get(query_embedding, tau=self.response_cache_tau,
+                                                 context=cache_context)
+            except Exception as e:
+                logger.warning("response cache lookup failed: %s", e)
+                cached = None
+            if cached is not None:
+                self._last_message_id = self._persist_message(
+                    self.conversation_id, "assistant", cached
+                )
+                self.chat_history.append({"role": "assistant", "content": cached})
+                if on_token:
+                    on_token(cached)
+                return cached
+
+        # Build the prompt head once per turn; tool iterations reuse it.
+        # Static instructions go first so OpenAI's prefix cache can hit them.
+        head = [
             {"role": "system", "content": self._build_system_prompt()},
-            *self.chat_history
+            {"role": "system", "content": self._build_memory_prompt()},
         ]
 
-        # First LLM call
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            tools=self.tools,
-            tool_choice="auto",
-            temperature=self.temperature,
-            max_tokens=self.max_tokens,
-        )
+        # Build messages once; tool iterations append to it in place
+        messages = [*head, *self._history_for_request()]
+
+        def push(entry: Dict):
+            self.chat_history.append(entry)
+            messages.append(entry)
 
-        message = response.choices[0].message
+        # First LLM call
+        message = self._complete_or_compact(head, messages, on_token)
 
         # Handle tool calls (up to 5 chained calls)
         max_iterations = 5
         iteration = 0
+        # Results of calls already made this turn, keyed on (tool, args) hash
+        seen: Dict[str, str] = {}
 
         while message.tool_calls and iteration < max_iterations:
             iteration += 1
 
-            parsed = parse_tool_call(message)
+            parsed = parse_tool_calls(message)
             if not parsed:
                 break
 
-            tool_name, arguments, call_id = parsed
-
-            # Check if approval needed
-            needs_approval, tool_info = check_approval_needed(tool_name, arguments)
-            if needs_approval:
-                approved = self._request_approval(tool_name, arguments)
-                if not approved:
-                    # Denied — tell the LLM
-                    self.chat_history.append({
-                        "role": "assistant", "content": None,
-                        "tool_calls": [{
-                            "id": call_id, "type": "function",
-                            "function": {"name": tool_name, "arguments": json.dumps(arguments)}
-                        }]
-                    })
-                    self.chat_history.append({
-                        "role": "tool", "tool_call_id": call_id,
-                        "content": "❌ User denied this action."
-                    })
-                    # Re-call LLM to acknowledge denial
-                    messages = [
-                        {"role": "system", "content": self._build_system_prompt()},
-                        *self.chat_history
-                    ]
-                    response = self.client.chat.completions.create(
-                        model=self.model, messages=messages, tools=self.tools,
-                        tool_choice="auto", temperature=self.temperature,
-                        max_tokens=self.max_tokens,
-                    )
-                    message = response.choices[0].message
+            calls = []
+            # call_key -> (tool_name, arguments, args_json, tool_info)
+            to_run: Dict[str, Tuple[str, Dict, str, Optional[Dict]]] = {}
+            denied = set()
+            for tool_name, arguments, args_json, call_id in parsed:
+                # The model's own argument text is reused for history, the
+                # message log and the audit row; nothing is re-encoded
+                call_key = hashlib.blake2b(
+                    (tool_name + args_json).encode(), digest_size=16
+                ).hexdigest()
+                calls.append((tool_name, call_id, args_json, call_key))
+
+                # A repeat of an earlier call this turn reuses its result
+                if call_key in seen or call_key in to_run or call_key in denied:
                     continue
 
-            # Execute the tool
-            result, duration_ms, tool_run_id = execute_tool(
-                tool_name, arguments.copy(),
-                conversation_id=self.conversation_id
-            )
-
-            self._last_tool_run_id = tool_run_id
+                # Check if approval needed; prompts stay one at a time
+                needs_approval, tool_info = check_approval_needed(tool_name, arguments)
+                if needs_approval and not self._request_approval(tool_name, arguments):
+                    denied.add(call_key)
+                    continue
+                to_run[call_key] = (tool_name, arguments, args_json, tool_info)
 
-            # Persist tool call message
-            tool_msg_id = add_message(
-                self.conversation_id, "assistant", f"[tool:{tool_name}]",
-                content_type="json",
-                tool_call_id=call_id,
-                tool_name=tool_name,
-                tool_input=json.dumps(arguments)
+            # Execute the tools (concurrently when parallel_tools is on)
+            outcomes = run_tool_calls(
+                list(to_run.values()),
+                conversation_id=self.conversation_id,
+                parallel=self.parallel_tools,
             )
-
-            # Add to chat history for LLM
-            self.chat_history.append({
+            for (call_key, (tool_name, *_)), (result, _, tool_run_id) in zip(to_run.items(), outcomes):
+                if tool_run_id:
+                    self._last_tool_run_id = tool_run_id
+                seen[call_key] = format_tool_result(tool_name, result)
+
+            # Add to chat history for LLM: one assistant entry carrying every
+            # call, then a tool message per call
+            push({
                 "role": "assistant", "content": None,
                 "tool_calls": [{
                     "id": call_id, "type": "function",
-                    "function": {"name": tool_name, "arguments": json.dumps(arguments)}
-                }]
+                    "function": {"name": tool_name, "arguments": args_json}
+                } for tool_name, call_id, args_json, _ in calls]
             })
+            to_persist = []
+            for tool_name, call_id, args_json, call_key in calls:
+                if call_key in denied:
+                    # Denied — tell the LLM
+                    push({
+                        "role": "tool", "tool_call_id": call_id,
+                        "content": "❌ User denied this action."
+                    })
+                    continue
 
-            formatted_result = format_tool_result(tool_name, result)
-
-            # Persist tool result message
-            add_message(
-                self.conversation_id, "tool", formatted_result,
-                tool_call_id=call_id, tool_name=tool_name
-            )
-            self.chat_history.append({
-                "role": "tool", "tool_call_id": call_id,
-                "content": formatted_result
-            })
+                formatted_result = seen[call_key]
+                # Tool call message, then its result
+                to_persist.append(("assistant", f"[tool:{tool_name}]", "json",
+                                   call_id, tool_name, args_json))
+                to_persist.append(("tool", formatted_result, "text",
+                                   call_id, tool_name))
+                push({
+                    "role": "tool", "tool_call_id": call_id,
+                    "content": formatted_result
+                })
+            if to_persist:
+                self._persist_messages(self.conversation_id, to_persist)
 
             # Re-call LLM
-            messages = [
-                {"role": "system", "content": self._build_system_prompt()},
-                *self.chat_history
-            ]
-            response = self.client.chat.completions.create(
-                model=self.model, messages=messages, tools=self.tools,
-                tool_choice="auto", temperature=self.temperature,
-                max_tokens=self.max_tokens,
-            )
-            message = response.choices[0].message
+            message = self._complete_or_compact(head, messages, on_token)
 
         # Final text response
         final_text = message.content or "(No response)"
 
         # Persist assistant response
-        self._last_message_id = add_message(
+        self._last_message_id = self._persist_message(
             self.conversation_id, "assistant", final_text
         )
         self.chat_history.append({"role": "assistant", "content": final_text})
 
-        # Trim in-memory history (keep last 30 turns)
-        if len(self.chat_history) > 60:
-            self.chat_history = self.chat_history[-30:]
+        # Only cache turns that didn't touch tools; tool results go stale
+        if query_embedding is not None and iteration == 0 and message.content:
+            try:
+                self.response_cache.put(query_embedding, final_text, context=cache_context)
+            except Exception as e:
+                logger.warning("response cache store failed: %s", e)
 
         return final_text
 
@@ -283,12 +676,75 @@ class Brain:
         if not self.conversation_id:
             return "No active conversation to rate."
 
+        # Feedback references the message and tool run; make sure they're written
+        self.flush()
         add_feedback(
             conversation_id=self.conversation_id,
             rating=rating,
-            message_id=self._last_message_id,
+            message_id=self.last_message_id,
             tool_run_id=self._last_tool_run_id,
             correction_text=correction,
             label=label,
         )
         return f"Feedback recorded: {'⭐' * rating}"
+
+    # ── Offline batch jobs ───────────────────────────────────────────
+    # Non-interactive LLM work goes through the Batch API (half price,
+    # results within the completion window). think() stays realtime.
+
+    def submit_batch(self, requests: List[Dict], completion_window: str = "24h") -> str:
+        """
+        Submit chat-completion request bodies as one OpenAI batch.
+
+        Args:
+            requests: Request bodies ({"messages": [...], ...}). `model`
+                defaults to the brain's model; `custom_id` may be set per
+                request, otherwise "req-<index>" is used.
+
+        Returns:
+            batch_id for poll_batch()
+        """
+        lines = []
+        for i, req in enumerate(requests):
+            body = {k: v for k, v in req.items() if k != "custom_id"}
+            body.setdefault("model", self.model)
+            lines.append(_dumps({
+                "custom_id": req.get("custom_id", f"req-{i}"),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": body,
+            }))
+        payload = ("\n".join(lines) + "\n").encode()
+
+        batch_file = self.client.files.create(
+            file=("jarvis_batch.jsonl", payload), purpose="batch"
+        )
+        batch = self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window=completion_window,
+        )
+        return batch.id
+
+    def poll_batch(self, batch_id: str) -> Dict:
+        """
+        Check a batch. Once completed, `results` maps custom_id to the
+        assistant text (or an error string).
+        """
+        batch = self.client.batches.retrieve(batch_id)
+        out = {"batch_id": batch_id, "status": batch.status, "results": {}}
+        if batch.status != "completed" or not batch.output_file_id:
+            return out
+
+        content = self.client.files.content(batch.output_file_id).text
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if row.get("error"):
+                out["results"][row["custom_id"]] = f"error: {row['error']}"
+                continue
+            body = (row.get("response") or {}).get("body") or {}
+            choices = body.get("choices") or [{}]
+            out["results"][row["custom_id"]] = (choices[0].get("message") or {}).get("content")
+        return out
@@ -54,6 +54,25 @@ def pe(t): print(f"{RED}Error:{RESET} {t}")
 def pk(t): print(f"{GREEN}✓{RESET} {t}")
 
 
+def stream_reply(brain: Brain, user_input: str) -> str:
+    """Run a turn, printing tokens as they stream in."""
+    streamed = False
+
+    def on_token(chunk: str):
+        nonlocal streamed
+        if not streamed:
+            print(f"\n{CYAN}Jarvis:{RESET} ", end="", flush=True)
+            streamed = True
+        print(chunk, end="", flush=True)
+
+    response = brain.think(user_input, on_token=on_token)
+    if streamed:
+        print()
+    else:
+        pj(response)
+    return response
+
+
 def approval_prompt(prompt_text: str) -> bool:
     print(f"\n{YELLOW}{prompt_text}{RESET}")
     while True:
@@ -148,9 +167,8 @@ def handle_slash(cmd: str, brain: Brain, trainer: Trainer):
             pe("Usage: /recall <search query>")
             return True
         try:
-            from memory.vectors import VectorStore
-            vs = VectorStore()
-            if not vs.available:
+            vs = brain.vs
+            if not vs or not vs.available:
                 ps("Vector store not available. Falling back to keyword search.")
                 for m in search_memories(query=query, limit=5):
                     ps(f"  • {m.get('title') or m['body'][:80]}")
@@ -174,10 +192,10 @@ def handle_slash(cmd: str, brain: Brain, trainer: Trainer):
             return True
         mem_id = store_memory(body=text, memory_type="note", source="user")
         try:
-            from memory.vectors import VectorStore
-            vs = VectorStore()
-            if vs.available:
-                vs.store(mem_id, text, metadata={"memory_type": "note", "source": "user"})
+            vs = brain.vs
+            if vs and vs.available:
+                vs.store_many([mem_id], [text],
+                              metadatas=[{"memory_type": "note", "source": "user"}])
         except Exception:
             pass
         pk(f"Stored: {mem_id}")
@@ -194,9 +212,8 @@ def handle_slash(cmd: str, brain: Brain, trainer: Trainer):
             pe("Usage: /forget <memory_id>")
             return True
         try:
-            from memory.vectors import VectorStore
-            vs = VectorStore()
-            if vs.available:
+            vs = brain.vs
+            if vs and vs.available:
                 vs.delete(parts[1])
         except Exception:
             pass
@@ -320,8 +337,7 @@ def main():
                 continue
 
             ps("  thinking...")
-            response = brain.think(user_input)
-            pj(response)
+            stream_reply(brain, user_input)
 
         except KeyboardInterrupt:
             brain.end_current_conversation()
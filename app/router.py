@@ -3,15 +3,50 @@ Jarvis v2 Router
 DB-driven tool registry with approval gates and full audit trail.
 """
 
+import io
+import os
 import json
 import time
+import queue
+import atexit
+import asyncio
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import MappingProxyType
 from typing import Dict, Optional, Tuple, List
 from tools import shell_tool, notes_tool, saviynt_tool, mac_tool, memory_tool
 from memory.memory import (
-    get_tool_by_name, create_tool_run, complete_tool_run,
-    create_approval, get_all_tools, get_connection
+    get_tool_by_name, complete_tool_runs_batch, new_tool_run_id,
+    create_approval, get_all_tools, get_pool, utc_timestamp, BASE_DIR
 )
 
+def _encode_default(obj):
+    # Read-only result mappings (tools' shared error results) encode as
+    # objects; orjson also rejects tuple subclasses such as NoteRow, which
+    # encode as arrays the way json does
+    if isinstance(obj, MappingProxyType):
+        return dict(obj)
+    if isinstance(obj, tuple):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# orjson is several times faster for the per-call encode/decode; its
+# decode error subclasses json.JSONDecodeError, so handlers are unchanged
+try:
+    import orjson
+
+    _loads = orjson.loads
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj, default=_encode_default).decode()
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj) -> str:
+        return json.dumps(obj, separators=(",", ":"), default=_encode_default)
+
 # ── Tool Executors ───────────────────────────────────────────────────
 # Maps tool_name (from DB) → module with run() function
 
@@ -28,6 +63,21 @@ TOOL_EXECUTORS = {
     "memory_forget":      memory_tool,
 }
 
+def _rest(arguments: Dict) -> Dict:
+    """Arguments minus "action", without touching the caller's dict."""
+    return {k: v for k, v in arguments.items() if k != "action"}
+
+
+# LLM tool name → handler(arguments) -> result. Handlers only read the
+# arguments, so a call can be retried or rescheduled with the same dict.
+_DISPATCH = {
+    "shell":   lambda a: shell_tool.run(a.get("command", "")),
+    "notes":   lambda a: notes_tool.run(a.get("action", "list"), **_rest(a)),
+    "saviynt": lambda a: saviynt_tool.run(a.get("action", "templates"), **_rest(a)),
+    "mac":     lambda a: mac_tool.run(a.get("action", ""), **_rest(a)),
+    "memory":  lambda a: memory_tool.run(a.get("action", "query"), **_rest(a)),
+}
+
 # ── OpenAI Function Definitions ─────────────────────────────────────
 # These are the tools the LLM sees. They map to the executors above.
 
@@ -40,19 +90,23 @@ LLM_TOOL_DEFS = [
 ]
 
 
-def get_openai_tools() -> list:
-    """Get tool definitions formatted for OpenAI function calling."""
-    return [
-        {
-            "type": "function",
-            "function": {
-                "name": t["name"],
-                "description": t["description"],
-                "parameters": t["parameters"]
-            }
+# Built once at import from the static TOOL_DEFs
+_OPENAI_TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": t["name"],
+            "description": t["description"],
+            "parameters": t["parameters"]
         }
-        for t in LLM_TOOL_DEFS
-    ]
+    }
+    for t in LLM_TOOL_DEFS
+]
+
+
+def get_openai_tools() -> list:
+    """Tool definitions formatted for OpenAI function calling. Shared; don't mutate."""
+    return _OPENAI_TOOLS
 
 
 # ── Tool Name Mapping ───────────────────────────────────────────────
@@ -86,24 +140,51 @@ MAC_ACTION_TO_DB = {
 }
 
 
+@functools.lru_cache(maxsize=64)
+def _cached_tool_by_name(tool_name: str) -> Optional[Dict]:
+    """
+    Tool registry row, memoized: the registry is effectively static at
+    runtime. Anything that writes the tools table must call
+    _cached_tool_by_name.cache_clear(). Callers must not mutate the dict.
+    """
+    return get_tool_by_name(tool_name)
+
+
+# LLM tool name → {action (None = missing/unknown) → DB tool_name}, merged
+# from the tables above so resolution is a single two-level lookup
+_RESOLVE = MappingProxyType({
+    llm_name: MappingProxyType({None: db_name, **actions})
+    for llm_name, db_name, actions in (
+        ("shell",   LLM_TO_DB_TOOL["shell"],   {}),
+        ("notes",   LLM_TO_DB_TOOL["notes"],   {}),
+        ("saviynt", LLM_TO_DB_TOOL["saviynt"], {}),
+        ("mac",     "mac_control",             MAC_ACTION_TO_DB),
+        ("memory",  "memory_query",            MEMORY_ACTION_TO_DB),
+    )
+})
+
+
 def _resolve_db_tool(llm_tool_name: str, arguments: Dict) -> str:
     """Resolve LLM tool name + arguments to a DB tool_name."""
-    if llm_tool_name == 'memory':
-        action = arguments.get('action', 'query')
-        return MEMORY_ACTION_TO_DB.get(action, 'memory_query')
-    if llm_tool_name == 'mac':
-        action = arguments.get('action', 'mac_control')
-        return MAC_ACTION_TO_DB.get(action, 'mac_control')
-    return LLM_TO_DB_TOOL.get(llm_tool_name, llm_tool_name)
+    table = _RESOLVE.get(llm_tool_name)
+    if table is None:
+        return llm_tool_name
+    action = arguments.get("action")
+    return table.get(action if isinstance(action, str) else None, table[None])
+
+
+def resolve(llm_tool_name: str, arguments: Dict) -> Tuple[str, Optional[Dict]]:
+    """LLM tool name + arguments -> (db_tool_name, tool_info or None)."""
+    db_tool_name = _resolve_db_tool(llm_tool_name, arguments)
+    return db_tool_name, _cached_tool_by_name(db_tool_name)
 
 
 def check_approval_needed(llm_tool_name: str, arguments: Dict) -> Tuple[bool, Optional[Dict]]:
     """
     Check if a tool call requires user approval before execution.
-    Returns (needs_approval, tool_info).
+    Returns (needs_approval, tool_info); pass tool_info on to execute_tool().
     """
-    db_tool_name = _resolve_db_tool(llm_tool_name, arguments)
-    tool_info = get_tool_by_name(db_tool_name)
+    _, tool_info = resolve(llm_tool_name, arguments)
 
     if tool_info and tool_info.get("requires_confirm"):
         return True, tool_info
@@ -111,142 +192,440 @@ def check_approval_needed(llm_tool_name: str, arguments: Dict) -> Tuple[bool, Op
     return False, tool_info
 
 
-def execute_tool(tool_name: str, arguments: Dict,
-                 conversation_id: str = None) -> Tuple[Dict, int, Optional[str]]:
+# tool_runs.output_json keeps this many characters of the encoded result
+_AUDIT_OUTPUT_LIMIT = 2000
+
+
+def _truncate_for_audit(value, limit: int = _AUDIT_OUTPUT_LIMIT):
     """
-    Execute a tool by LLM name with given arguments.
-    Creates a tool_run audit record.
-    
+    Copy of a result with long strings and lists cut down before encoding,
+    so a megabyte of shell output isn't serialized only to keep 2000 chars.
+    Anything cut would have been past `limit` in the encoded form anyway,
+    so the first `limit` characters come out the same.
+    """
+    if isinstance(value, str):
+        return value if len(value) <= limit else value[:limit] + "…<truncated>"
+    if isinstance(value, (dict, MappingProxyType)):
+        return {k: _truncate_for_audit(v, limit) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        # Every encoded element takes at least two characters ("0,")
+        return [_truncate_for_audit(v, limit) for v in value[:limit // 2 + 1]]
+    return value
+
+
+def _invoke(tool_name: str, arguments: Dict, conversation_id: str = None,
+            arguments_json: str = None,
+            tool_info: Dict = None) -> Tuple[Dict, int, Optional[Dict]]:
+    """
+    Run a tool without writing its audit record. `arguments_json` is the
+    call's original argument text, stored as-is instead of re-encoding;
+    `tool_info` is the registry row from check_approval_needed(), if known.
+
     Returns:
-        (result_dict, duration_ms, tool_run_id)
+        (result_dict, duration_ms, audit_row) — audit_row is the finished
+        tool_runs row for record_tool_run()/complete_tool_runs_batch(),
+        or None without a conversation.
     """
     # Resolve DB tool for audit
-    db_tool_name = _resolve_db_tool(tool_name, arguments)
-    tool_info = get_tool_by_name(db_tool_name)
+    if tool_info:
+        db_tool_name = tool_info["tool_name"]
+    else:
+        db_tool_name, tool_info = resolve(tool_name, arguments)
     # Ensure tool exists to satisfy FK constraints in tool_runs
     if not tool_info:
         tool_id = f"tool_{db_tool_name}"
         try:
-            conn = get_connection()
-            conn.execute("INSERT OR IGNORE INTO tools (tool_id, tool_name, tool_category, description, risk_level, requires_confirm, enabled) VALUES (?,?,?,?,?,?,1)",
-                         (tool_id, db_tool_name, 'system', 'Auto-registered tool', 'high', 1))
-            conn.commit()
-            conn.close()
+            with get_pool().writer() as conn:
+                conn.execute("INSERT OR IGNORE INTO tools (tool_id, tool_name, tool_category, description, risk_level, requires_confirm, enabled) VALUES (?,?,?,?,?,?,1)",
+                             (tool_id, db_tool_name, 'system', 'Auto-registered tool', 'high', 1))
         except Exception:
             pass
-        tool_info = get_tool_by_name(db_tool_name)
+        _cached_tool_by_name.cache_clear()
+        tool_info = _cached_tool_by_name(db_tool_name)
     tool_id = tool_info["tool_id"] if tool_info else f"tool_{db_tool_name}"
 
-    # Create audit record
-    tool_run_id = None
+    input_json = None
     if conversation_id:
-        tool_run_id = create_tool_run(
-            conversation_id=conversation_id,
-            tool_id=tool_id,
-            input_json=json.dumps(arguments),
-            status="running"
-        )
-
-    start = time.time()
+        input_json = arguments_json or _dumps(arguments)
+    started_at = utc_timestamp()
+    start = time.perf_counter_ns()
 
+    handler = _DISPATCH.get(tool_name)
     try:
-        if tool_name == "shell":
-            result = shell_tool.run(arguments.get("command", ""))
-        elif tool_name == "notes":
-            action = arguments.pop("action", "list")
-            result = notes_tool.run(action, **arguments)
-        elif tool_name == "saviynt":
-            action = arguments.pop("action", "templates")
-            result = saviynt_tool.run(action, **arguments)
-        elif tool_name == "mac":
-            action = arguments.pop("action", "")
-            result = mac_tool.run(action, **arguments)
-        elif tool_name == "memory":
-            action = arguments.pop("action", "query")
-            result = memory_tool.run(action, **arguments)
+        if handler:
+            result = handler(arguments)
         else:
             result = {"success": False, "error": f"Unknown tool: {tool_name}"}
     except Exception as e:
         result = {"success": False, "error": f"Tool execution error: {e}"}
 
-    duration_ms = int((time.time() - start) * 1000)
+    duration_ms = (time.perf_counter_ns() - start) // 1_000_000
+
+    audit_row = None
+    if conversation_id:
+        audit_row = {
+            "conversation_id": conversation_id,
+            "tool_id": tool_id,
+            "status": "success" if result.get("success", False) else "failed",
+            "input_json": input_json,
+            "output_json": _dumps(_truncate_for_audit(result))[:_AUDIT_OUTPUT_LIMIT],
+            "error_text": result.get("error"),
+            "duration_ms": duration_ms,
+            "started_at": started_at,
+        }
+    return result, duration_ms, audit_row
 
-    # Complete audit record
-    if tool_run_id:
-        complete_tool_run(
-            tool_run_id=tool_run_id,
-            status="success" if result.get("success", False) else "failed",
-            output_json=json.dumps(result)[:2000],
-            error_text=result.get("error"),
-            duration_ms=duration_ms
-        )
 
+def execute_tool(tool_name: str, arguments: Dict, conversation_id: str = None,
+                 arguments_json: str = None,
+                 tool_info: Dict = None) -> Tuple[Dict, int, Optional[str]]:
+    """
+    Execute a tool by LLM name with given arguments.
+    Writes one finished tool_run audit record once the tool returns.
+    Pass `arguments_json` (the raw tool-call arguments) to audit it verbatim,
+    and `tool_info` from check_approval_needed() to skip a second lookup.
+    
+    Returns:
+        (result_dict, duration_ms, tool_run_id)
+    """
+    result, duration_ms, audit_row = _invoke(tool_name, arguments, conversation_id,
+                                             arguments_json, tool_info)
+    tool_run_id = _AUDIT.put(audit_row) if audit_row else None
     return result, duration_ms, tool_run_id
 
 
-def parse_tool_call(message) -> Optional[Tuple[str, Dict, str]]:
-    """Parse an OpenAI tool call. Returns (tool_name, arguments, call_id)."""
-    if not message.tool_calls:
+# Worker threads for tool calls, kept for the life of the process so their
+# per-thread SQLite connections are reused instead of reopened every turn
+_TOOL_POOL = ThreadPoolExecutor(thread_name_prefix="jarvis-tool")
+
+
+def _offload(fn, *args):
+    """Run fn(*args) on _TOOL_POOL from the running event loop."""
+    return asyncio.get_running_loop().run_in_executor(_TOOL_POOL, fn, *args)
+
+
+async def execute_tool_async(tool_name: str, arguments: Dict, conversation_id: str = None,
+                             arguments_json: str = None,
+                             tool_info: Dict = None) -> Tuple[Dict, int, Optional[str]]:
+    """
+    execute_tool() on a worker thread. Every tool (and the audit write
+    after it) is blocking IO, so the whole call is offloaded.
+    """
+    return await _offload(execute_tool, tool_name, arguments, conversation_id,
+                          arguments_json, tool_info)
+
+
+# ── Audit Writer ────────────────────────────────────────────────────
+# Finished tool runs are appended to logs/audit.jsonl and bulk-inserted
+# into tool_runs from a background thread, off the tool call's path.
+
+AUDIT_LOG_PATH = os.path.join(BASE_DIR, "logs", "audit.jsonl")
+_AUDIT_BATCH_ROWS = 100
+_AUDIT_FLUSH_S = 1.0
+
+
+class _AuditWriter:
+    def __init__(self, path: str = AUDIT_LOG_PATH):
+        self.path = path
+        # audit row dicts, or a Future as a flush marker
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def put(self, row: Dict) -> str:
+        """Queue a finished tool_runs row; returns its tool_run_id right away."""
+        row["tool_run_id"] = new_tool_run_id()
+        row["finished_at"] = utc_timestamp()
+        self._queue.put(row)
+        self._start()
+        return row["tool_run_id"]
+
+    def flush(self):
+        """Block until queued rows are handed to the SQLite writer (see get_pool().flush())."""
+        if self._thread is None:
+            return
+        marker: Future = Future()
+        self._queue.put(marker)
+        marker.result()
+
+    def _start(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._loop, name="jarvis-audit", daemon=True
+                    )
+                    self._thread.start()
+
+    def _loop(self):
+        while True:
+            # Batch up to _AUDIT_BATCH_ROWS rows or _AUDIT_FLUSH_S seconds,
+            # cut short by a flush marker
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + _AUDIT_FLUSH_S
+            while len(batch) < _AUDIT_BATCH_ROWS and not isinstance(batch[-1], Future):
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            rows = [item for item in batch if not isinstance(item, Future)]
+            if rows:
+                self._write(rows)
+            for item in batch:
+                if isinstance(item, Future):
+                    item.set_result(None)
+
+    def _write(self, rows: List[Dict]):
+        try:
+            with open(self.path, "a") as f:
+                f.write("".join(_dumps(r) + "\n" for r in rows))
+        except Exception as e:
+            print(f"[router] audit log write failed: {e}")
+        try:
+            complete_tool_runs_batch(rows).add_done_callback(_report_insert_error)
+        except Exception as e:
+            print(f"[router] audit insert failed: {e}")
+
+
+def _report_insert_error(future: Future):
+    # The INSERT runs later on the SQLite writer thread; its errors land here
+    e = future.exception()
+    if e is not None:
+        print(f"[router] audit insert failed: {e}")
+
+
+_AUDIT = _AuditWriter()
+
+
+def flush_audit():
+    """Block until every finished tool run has been queued for SQLite."""
+    _AUDIT.flush()
+
+
+atexit.register(flush_audit)
+
+
+# One call in a batch: (tool_name, arguments, arguments_json, tool_info).
+# The last two may be None; they only save re-encoding and re-lookup.
+ToolCall = Tuple[str, Dict, Optional[str], Optional[Dict]]
+
+
+def _parse_rw_set(text: Optional[str]) -> Optional[frozenset]:
+    """'W:memory,R:config' -> {('W','memory'), ('R','config')}; None if unknown."""
+    if text is None:
         return None
-    tool_call = message.tool_calls[0]
-    tool_name = tool_call.function.name
-    try:
-        arguments = json.loads(tool_call.function.arguments)
-    except json.JSONDecodeError:
-        arguments = {}
-    return tool_name, arguments, tool_call.id
+    entries = set()
+    for part in text.split(","):
+        mode, _, resource = part.strip().partition(":")
+        if resource:
+            entries.add((mode.upper(), resource))
+    return frozenset(entries)
+
+
+def _conflicts(a: Optional[frozenset], b: Optional[frozenset]) -> bool:
+    """Two calls conflict if they share a resource and either one writes it."""
+    if a is None or b is None:
+        return True
+    return any(
+        res_a == res_b and "W" in (mode_a, mode_b)
+        for mode_a, res_a in a for mode_b, res_b in b
+    )
+
+
+class Scheduler:
+    """
+    Runs a batch of tool calls as a dependency graph built from each DB
+    tool's rw_set. Every call becomes a task that first awaits the earlier
+    calls it conflicts with, so independent calls overlap and conflicting
+    ones keep the order the LLM issued them in. Tools without an rw_set
+    are treated as conflicting with everything.
+    """
+
+    def __init__(self, conversation_id: str = None):
+        self.conversation_id = conversation_id
+
+    @staticmethod
+    def rw_set_for(tool_name: str, arguments: Dict,
+                   tool_info: Dict = None) -> Optional[frozenset]:
+        if not tool_info:
+            _, tool_info = resolve(tool_name, arguments)
+        return _parse_rw_set(tool_info.get("rw_set")) if tool_info else None
+
+    async def _run_after(self, deps: List[asyncio.Task], call: ToolCall):
+        if deps:
+            await asyncio.wait(deps)
+        return await _offload(_invoke, call[0], call[1], self.conversation_id,
+                              call[2], call[3])
+
+    async def run(self, tool_calls: List[ToolCall]) -> List:
+        """
+        Schedule the batch; returns _invoke() outcomes (or exceptions) in
+        input order. Audit rows are left to the caller to write in bulk.
+        """
+        rw_sets = [self.rw_set_for(name, args, info) for name, args, _, info in tool_calls]
+        tasks: List[asyncio.Task] = []
+        for i, call in enumerate(tool_calls):
+            deps = [tasks[j] for j in range(i) if _conflicts(rw_sets[i], rw_sets[j])]
+            tasks.append(asyncio.ensure_future(self._run_after(deps, call)))
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def execute_tool_calls(tool_calls: List[ToolCall],
+                             conversation_id: str = None) -> List[Tuple[Dict, int, Optional[str]]]:
+    """
+    Run a batch of tool calls concurrently where their rw_sets allow (see
+    Scheduler), or all at once when every tool is commutative; total
+    latency approaches the slowest independent chain rather than the sum.
+    Results come back in input order, and a call that raises is reported
+    as a failed result instead of failing the batch. Audit records go
+    through the background audit writer.
+    """
+    tool_calls = [
+        (name, args, args_json, info or resolve(name, args)[1])
+        for name, args, args_json, info in tool_calls
+    ]
+    if all(info and info.get("commutative") for *_, info in tool_calls):
+        # Nothing in the batch has side effects; skip building the DAG
+        outcomes = await asyncio.gather(
+            *[_offload(_invoke, name, args, conversation_id, args_json, info)
+              for name, args, args_json, info in tool_calls],
+            return_exceptions=True,
+        )
+    else:
+        outcomes = await Scheduler(conversation_id).run(tool_calls)
+    outcomes = [
+        ({"success": False, "error": f"Tool execution error: {o}"}, 0, None)
+        if isinstance(o, BaseException) else o
+        for o in outcomes
+    ]
+    return [
+        (result, duration_ms, _AUDIT.put(row) if row else None)
+        for result, duration_ms, row in outcomes
+    ]
+
+
+def run_tool_calls(tool_calls: List[ToolCall], conversation_id: str = None,
+                   parallel: bool = True) -> List[Tuple[Dict, int, Optional[str]]]:
+    """
+    Sync entry point for a batch of ToolCall tuples.
+    With parallel=False (or a single call) they run one after another.
+    """
+    if not parallel or len(tool_calls) < 2:
+        return [execute_tool(name, args, conversation_id=conversation_id,
+                             arguments_json=args_json, tool_info=info)
+                for name, args, args_json, info in tool_calls]
+    return asyncio.run(execute_tool_calls(tool_calls, conversation_id))
+
+
+def parse_tool_call(message) -> Optional[Tuple[str, Dict, str, str]]:
+    """
+    Parse an OpenAI tool call.
+    Returns (tool_name, arguments, arguments_json, call_id).
+    """
+    calls = parse_tool_calls(message)
+    return calls[0] if calls else None
+
+
+def parse_tool_calls(message) -> List[Tuple[str, Dict, str, str]]:
+    """
+    Parse every tool call in a message.
+    Returns [(tool_name, arguments, arguments_json, call_id)]; arguments_json
+    is the model's original text, reusable for audit and history as-is.
+    """
+    parsed = []
+    for tool_call in message.tool_calls or []:
+        arguments_json = tool_call.function.arguments
+        arguments = None
+        # No-argument calls skip the decoder (and its exception) entirely
+        if arguments_json and arguments_json != "{}":
+            try:
+                arguments = _loads(arguments_json)
+            except json.JSONDecodeError:
+                pass
+        if not isinstance(arguments, dict):
+            arguments, arguments_json = {}, "{}"
+        parsed.append((tool_call.function.name, arguments, arguments_json, tool_call.id))
+    return parsed
+
+
+def _fmt_shell(result: Dict) -> str:
+    output = result.get("output", "")
+    error = result.get("error", "")
+    parts = []
+    if output:
+        parts.append(output)
+    if error:
+        parts.append(f"(stderr: {error})")
+    return "\n".join(parts) if parts else "(no output)"
+
+
+def _fmt_notes(result: Dict) -> str:
+    if "notes" in result:
+        buf = io.StringIO()
+        buf.write(f"Found {result['count']} note(s):")
+        for n in result["notes"]:  # NoteRow tuples
+            if n.tags:
+                buf.write(f"\n  #{n.id} [{', '.join(n.tags)}]: {n.text}")
+            else:
+                buf.write(f"\n  #{n.id}: {n.text}")
+        return buf.getvalue()
+    return result["message"] if "message" in result else _dumps(result)
+
+
+def _fmt_saviynt(result: Dict) -> str:
+    if "query" in result:
+        return f"Generated query ({result.get('template', 'custom')}):\n\n{result['query']}"
+    if "templates" in result:
+        buf = io.StringIO()
+        buf.write("Available Saviynt templates:")
+        for t in result["templates"]:
+            buf.write(f"\n  • {t['name']}")
+        return buf.getvalue()
+    if "json" in result:
+        return f"{result.get('description', '')}:\n\n{json.dumps(result['json'], indent=2)}"
+    return json.dumps(result, indent=2)
+
+
+def _fmt_mac(result: Dict) -> str:
+    output = result.get("output", "")
+    return output if output else "✓ Done"
+
+
+def _fmt_memory(result: Dict) -> str:
+    if "memories" in result:
+        method = result.get("method", "keyword")
+        buf = io.StringIO()
+        buf.write(f"Found {result['count']} memories ({method}):")
+        for m in result["memories"]:
+            title = m.get("title") or m.get("text", m.get("body", ""))[:80]
+            if m.get("similarity"):
+                buf.write(f"\n  • {title} [{m['similarity']:.2f}]")
+            else:
+                buf.write(f"\n  • {title}")
+        return buf.getvalue()
+    return result["message"] if "message" in result else _dumps(result)
+
+
+def _fmt_default(result: Dict) -> str:
+    return json.dumps(result, indent=2)
+
+
+# LLM tool name → formatter for its successful results
+_FORMATTERS = {
+    "shell":   _fmt_shell,
+    "notes":   _fmt_notes,
+    "saviynt": _fmt_saviynt,
+    "mac":     _fmt_mac,
+    "memory":  _fmt_memory,
+}
 
 
 def format_tool_result(tool_name: str, result: Dict) -> str:
     """Format tool result for display and LLM context."""
     if not result.get("success", False):
         return f"❌ [{tool_name}] Error: {result.get('error', 'Unknown error')}"
-
-    if tool_name == "shell":
-        output = result.get("output", "")
-        error = result.get("error", "")
-        parts = []
-        if output:
-            parts.append(output)
-        if error:
-            parts.append(f"(stderr: {error})")
-        return "\n".join(parts) if parts else "(no output)"
-
-    elif tool_name == "notes":
-        if "notes" in result:
-            lines = [f"Found {result['count']} note(s):"]
-            for n in result["notes"]:
-                tags = ", ".join(n.get("tags", []))
-                tag_str = f" [{tags}]" if tags else ""
-                lines.append(f"  #{n['id']}{tag_str}: {n['text']}")
-            return "\n".join(lines)
-        return result.get("message", json.dumps(result))
-
-    elif tool_name == "saviynt":
-        if "query" in result:
-            return f"Generated query ({result.get('template', 'custom')}):\n\n{result['query']}"
-        if "templates" in result:
-            lines = ["Available Saviynt templates:"]
-            for t in result["templates"]:
-                lines.append(f"  • {t['name']}")
-            return "\n".join(lines)
-        if "json" in result:
-            return f"{result.get('description', '')}:\n\n{json.dumps(result['json'], indent=2)}"
-        return json.dumps(result, indent=2)
-
-    elif tool_name == "mac":
-        output = result.get("output", "")
-        return output if output else "✓ Done"
-
-    elif tool_name == "memory":
-        if "memories" in result:
-            method = result.get("method", "keyword")
-            lines = [f"Found {result['count']} memories ({method}):"]
-            for m in result["memories"]:
-                score = f" [{m['score']:.2f}]" if m.get("score") else ""
-                title = m.get("title") or m.get("text", m.get("body", ""))[:80]
-                lines.append(f"  • {title}{score}")
-            return "\n".join(lines)
-        return result.get("message", json.dumps(result))
-
-    return json.dumps(result, indent=2)
+    return _FORMATTERS.get(tool_name, _fmt_default)(result)
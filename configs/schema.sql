@@ -36,6 +36,8 @@ CREATE TABLE IF NOT EXISTS conversations (
     FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
 );
 
+CREATE INDEX IF NOT EXISTS idx_conversations_user_started ON conversations(user_id, started_at DESC);
+
 CREATE TABLE IF NOT EXISTS messages (
     message_id      TEXT PRIMARY KEY,
     conversation_id TEXT NOT NULL,
@@ -62,7 +64,9 @@ CREATE TABLE IF NOT EXISTS tools (
     description         TEXT,
     risk_level          TEXT DEFAULT 'medium',-- "low","medium","high"
     requires_confirm    INTEGER DEFAULT 1,
-    enabled             INTEGER DEFAULT 1
+    enabled             INTEGER DEFAULT 1,
+    rw_set              TEXT,                -- "R:memory", "W:fs,R:config"; NULL = conflicts with everything
+    commutative         INTEGER DEFAULT 0    -- 1 = side-effect free; batches of these skip scheduling
 );
 
 CREATE TABLE IF NOT EXISTS tool_runs (
@@ -84,6 +88,7 @@ CREATE TABLE IF NOT EXISTS tool_runs (
 
 CREATE INDEX IF NOT EXISTS idx_tool_runs_conv ON tool_runs(conversation_id);
 CREATE INDEX IF NOT EXISTS idx_tool_runs_status ON tool_runs(status);
+CREATE INDEX IF NOT EXISTS idx_tool_runs_started ON tool_runs(started_at DESC);
 
 -- Approvals for risky actions
 CREATE TABLE IF NOT EXISTS approvals (
@@ -98,6 +103,8 @@ CREATE TABLE IF NOT EXISTS approvals (
     FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE
 );
 
+CREATE INDEX IF NOT EXISTS idx_approvals_user_decision ON approvals(user_id, decision);
+
 -- =========================
 -- Memory system (enhanced)
 -- =========================
@@ -120,6 +127,7 @@ CREATE TABLE IF NOT EXISTS memory_items (
 CREATE INDEX IF NOT EXISTS idx_memory_user ON memory_items(user_id, memory_type);
 CREATE INDEX IF NOT EXISTS idx_memory_tags ON memory_items(tags);
 CREATE INDEX IF NOT EXISTS idx_memory_importance ON memory_items(importance DESC);
+CREATE INDEX IF NOT EXISTS idx_mem_user_imp_upd ON memory_items(user_id, importance DESC, updated_at DESC);
 
 -- Vector index registry (actual vectors in Chroma)
 CREATE TABLE IF NOT EXISTS memory_vectors (
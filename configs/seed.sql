@@ -26,6 +26,17 @@ INSERT OR IGNORE INTO tools (tool_id, tool_name, tool_category, description, ris
     -- Notes (legacy compat, now routes through memory_write)
     ('tool_notes',         'notes',         'memory', 'Quick notes (add, search, delete)',                     'low', 0);
 
+-- Read/write sets for the tool scheduler: calls whose sets don't conflict
+-- (no shared resource with a W on either side) may run concurrently
+UPDATE tools SET rw_set = 'W:memory'  WHERE tool_name IN ('memory_write', 'memory_pin', 'memory_forget', 'notes') AND rw_set IS NULL;
+UPDATE tools SET rw_set = 'R:memory'  WHERE tool_name = 'memory_query' AND rw_set IS NULL;
+UPDATE tools SET rw_set = 'W:fs'      WHERE tool_name = 'shell' AND rw_set IS NULL;
+UPDATE tools SET rw_set = 'W:desktop' WHERE tool_name IN ('open_app', 'open_url', 'mac_control') AND rw_set IS NULL;
+UPDATE tools SET rw_set = 'R:config'  WHERE tool_name IN ('saviynt_query', 'saviynt_connector') AND rw_set IS NULL;
+
+-- Side-effect-free tools: a batch made only of these runs as a plain gather
+UPDATE tools SET commutative = 1 WHERE tool_name IN ('memory_query', 'saviynt_query', 'saviynt_connector');
+
 -- Default preferences
 INSERT OR IGNORE INTO user_preferences (user_id, pref_key, pref_value, confidence, source) VALUES
     ('u_rakin', 'response.style',       'concise',          1.0, 'explicit'),
@@ -0,0 +1,156 @@
+"""
+Jarvis v2 Semantic Response Cache
+Maps user-input embeddings to final assistant responses so near-duplicate
+phrasings ("what's on my calendar", "calendar today") skip the LLM call.
+Each entry also carries a context key (e.g. a digest of the preceding
+assistant turn); lookups only match entries stored under the same context.
+Entries expire after a TTL and the least recently used entry is evicted
+once the cache is full.
+
+Usage:
+    from memory.cache import SemanticResponseCache
+    cache = SemanticResponseCache()
+    cache.put(embedding, "Here are your meetings...", context="...")
+    hit = cache.get(other_embedding, tau=0.9, context="...")  # str or None
+"""
+
+import math
+import time
+from array import array
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+NUMPY_AVAILABLE = False
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    pass
+
+DEFAULT_TAU = 0.9          # query-to-query cosine similarity for a hit
+DEFAULT_TTL_S = 3600
+DEFAULT_MAX_ENTRIES = 256
+
+
+def _normalize(vec: List[float]) -> List[float]:
+    """L2-normalize so cosine similarity reduces to a plain dot product."""
+    norm = math.sqrt(sum(x * x for x in vec))
+    if norm == 0:
+        return []
+    return [x / norm for x in vec]
+
+
+def _dot(a: List[float], b: List[float]) -> float:
+    return sum(x * y for x, y in zip(a, b))
+
+
+class SemanticResponseCache:
+    """In-process LRU + TTL cache keyed on query embeddings."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttl_s: float = DEFAULT_TTL_S):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        # entry_id -> (unit-norm embedding, response, stored_at, context hash).
+        # Without numpy the embedding is a float32 array; with numpy it lives
+        # only as a row of _rows and the entry holds that row's index instead.
+        self._entries: "OrderedDict[int, Tuple[object, str, float, int]]" = OrderedDict()
+        self._next_id = 0
+        # Fixed-size float16 matrix, one row per entry slot; rows are written
+        # on put and masked out on removal, never rebuilt wholesale. Half
+        # precision halves the RAM and moves unit-vector cosines by ~1e-3,
+        # well inside the margin any useful tau leaves
+        self._rows: Optional["np.ndarray"] = None
+        self._live: Optional["np.ndarray"] = None
+        self._contexts: Optional["np.ndarray"] = None  # slot -> context hash
+        self._slot_ids: List[Optional[int]] = []  # slot -> entry_id
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, entry_id: int):
+        slot = self._entries.pop(entry_id)[0]
+        if self._rows is not None:
+            self._live[slot] = False
+            self._free.append(slot)
+
+    def _expire(self, now: float):
+        stale = [k for k, (_, _, ts, _) in self._entries.items() if now - ts > self.ttl_s]
+        for k in stale:
+            self._remove(k)
+
+    def _best_match(self, query: List[float], tau: float, context: int) -> Optional[int]:
+        """Id of the same-context entry with the highest similarity >= tau, if any."""
+        if self._rows is not None:
+            if len(query) != self._rows.shape[1]:
+                return None  # embedded by a different model
+            # One mat-vec over every slot, accumulated in float32; rows are
+            # pre-normalized
+            scores = np.matmul(self._rows, np.asarray(query, dtype=np.float32),
+                               dtype=np.float32)
+            scores[~(self._live & (self._contexts == context))] = -np.inf
+            best = int(np.argmax(scores))
+            if scores[best] < tau:
+                return None
+            return self._slot_ids[best]
+
+        best_id, best_score = None, tau
+        for entry_id, (vec, _, _, ctx) in self._entries.items():
+            if ctx != context or len(vec) != len(query):
+                continue
+            score = _dot(query, vec)
+            if score >= best_score:
+                best_id, best_score = entry_id, score
+        return best_id
+
+    def get(self, embedding: List[float], tau: float = DEFAULT_TAU,
+            context: str = "") -> Optional[str]:
+        """
+        Return the cached response most similar to `embedding` if it clears
+        `tau`, among entries stored with the same `context`.
+        """
+        query = _normalize(embedding) if embedding else []
+        if not query:
+            return None
+        self._expire(time.time())
+        if not self._entries:
+            return None
+
+        best_id = self._best_match(query, tau, hash(context))
+        if best_id is None:
+            return None
+        self._entries.move_to_end(best_id)
+        return self._entries[best_id][1]
+
+    def put(self, embedding: List[float], response: str, context: str = ""):
+        vec = _normalize(embedding) if embedding else []
+        if not vec or not response:
+            return
+        while len(self._entries) >= self.max_entries:
+            self._remove(next(iter(self._entries)))
+        if NUMPY_AVAILABLE:
+            if self._rows is None or self._rows.shape[1] != len(vec):
+                # first entry, or the embedding model changed: start over
+                self._entries.clear()
+                self._rows = np.zeros((self.max_entries, len(vec)), dtype=np.float16)
+                self._live = np.zeros(self.max_entries, dtype=bool)
+                self._contexts = np.zeros(self.max_entries, dtype=np.int64)
+                self._slot_ids = [None] * self.max_entries
+                self._free = list(range(self.max_entries - 1, -1, -1))
+            slot = self._free.pop()
+            self._slot_ids[slot] = self._next_id
+            self._rows[slot] = vec
+            self._live[slot] = True
+            self._contexts[slot] = hash(context)
+            vec = slot
+        else:
+            vec = array("f", vec)
+        self._entries[self._next_id] = (vec, response, time.time(), hash(context))
+        self._next_id += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._rows = self._live = self._contexts = None
+        self._slot_ids = []
+        self._free = []
@@ -7,9 +7,17 @@ approvals, and Chroma vector search.
 import sqlite3
 import json
 import os
-import uuid
+import queue
+import atexit
 import hashlib
-from datetime import datetime, timedelta
+import secrets
+import threading
+import time
+import weakref
+from collections import namedtuple
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 from typing import Optional, List, Dict, Any, Tuple
 
 # ── Paths ────────────────────────────────────────────────────────────
@@ -21,38 +29,476 @@ SEED_PATH = os.path.join(BASE_DIR, "configs", "seed.sql")
 
 DEFAULT_USER = "u_rakin"
 
+# Bumped by every write that feeds build_context(), so callers can cache
+# the rendered context and only rebuild when the underlying data changed.
+_DATA_VERSION = 0
+
+
+def data_version() -> int:
+    return _DATA_VERSION
+
+
+def _bump_version():
+    global _DATA_VERSION
+    _DATA_VERSION += 1
+
 
 def _uid(prefix: str = "") -> str:
-    return f"{prefix}{uuid.uuid4().hex[:12]}"
+    """
+    Time-ordered id: 11 hex digits of epoch milliseconds, then 8 random hex
+    digits. New rows sort after old ones, so primary-key inserts append to
+    the right edge of the B-tree instead of splitting random pages.
+    """
+    return f"{prefix}{int(time.time() * 1000):011x}{secrets.token_hex(4)}"
+
+
+def new_id(prefix: str = "") -> str:
+    return _uid(prefix)
+
+
+def new_tool_run_id() -> str:
+    return _uid("tr_")
+
+
+_NOW_TTL_NS = 10_000_000   # 10 ms
+_NOW_CACHE: Tuple[int, str] = (-_NOW_TTL_NS, "")
+
+
+def _now() -> str:
+    """
+    Local time as ISO-8601, reused for up to 10 ms so bursts of writes
+    don't each pay for a clock read and a format.
+    """
+    global _NOW_CACHE
+    tick = time.monotonic_ns()
+    cached_at, iso = _NOW_CACHE
+    if tick - cached_at < _NOW_TTL_NS:
+        return iso
+    iso = datetime.now().isoformat()
+    _NOW_CACHE = (tick, iso)
+    return iso
+
+
+def utc_timestamp() -> str:
+    """Current UTC time in SQLite's datetime('now') format."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
 
 
 # ── Connection ───────────────────────────────────────────────────────
 
-def get_connection(db_path: str = None) -> sqlite3.Connection:
-    db = db_path or DB_PATH
-    conn = sqlite3.connect(db)
+class _CachedConnection(sqlite3.Connection):
+    """Per-thread connection that outlives its callers: close() is a no-op."""
+
+    def close(self):
+        pass
+
+
+class _ThreadConnections(dict):
+    """
+    One thread's connections by path. Its thread-local slot is dropped when
+    the thread exits, which closes them, so short-lived threads don't leak
+    file descriptors.
+    """
+
+    def __del__(self):
+        for conn in self.values():
+            try:
+                sqlite3.Connection.close(conn)
+            except Exception:
+                pass
+
+
+# Per-connection prepared-statement cache (stdlib default is 128). Hot SQL
+# is kept as fixed strings so repeat calls reuse the compiled statement.
+_CACHED_STATEMENTS = 256
+
+_TLS = threading.local()
+# Open per-thread connections, for closing at exit; weak so a finished
+# thread's connections drop out on their own
+_ALL_CONNS: "weakref.WeakSet[sqlite3.Connection]" = weakref.WeakSet()
+_ALL_CONNS_LOCK = threading.Lock()
+
+_CHECKPOINT_INTERVAL_S = 60
+_CHECKPOINTED: set = set()
+
+
+def _checkpoint_loop(db: str):
+    """Periodically fold the WAL back into the database and truncate it."""
+    while True:
+        time.sleep(_CHECKPOINT_INTERVAL_S)
+        try:
+            get_connection(db).execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error:
+            pass
+
+
+def _start_checkpointer(db: str):
+    with _ALL_CONNS_LOCK:
+        if db in _CHECKPOINTED:
+            return
+        _CHECKPOINTED.add(db)
+    threading.Thread(target=_checkpoint_loop, args=(db,),
+                     name="jarvis-wal-checkpoint", daemon=True).start()
+
+
+def _make(db: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(db) or ".", exist_ok=True)
+    # Not pinned to its thread so it can be closed from wherever the
+    # thread's locals are torn down, or at exit
+    conn = sqlite3.connect(db, factory=_CachedConnection, check_same_thread=False,
+                           cached_statements=_CACHED_STATEMENTS)
     conn.row_factory = sqlite3.Row
     conn.execute("PRAGMA journal_mode=WAL")
+    # WAL + NORMAL only syncs at checkpoints, not on every commit
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA wal_autocheckpoint=1000")
+    _start_checkpointer(db)
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-64000")
+    conn.execute("PRAGMA mmap_size=268435456")
     conn.execute("PRAGMA foreign_keys=ON")
+    with _ALL_CONNS_LOCK:
+        _ALL_CONNS.add(conn)
     return conn
 
 
-def init_db(db_path: str = None):
-    """Create all tables from schema.sql and run seed.sql."""
+def get_connection(db_path: str = None) -> sqlite3.Connection:
+    """
+    This thread's connection to `db_path`, opened (and its PRAGMAs applied)
+    on first use and reused afterwards. Callers must not close it.
+    """
+    db = db_path or DB_PATH
+    if db == ":memory:":
+        # Each ":memory:" connection is a private database, so every thread
+        # shares the pool's one connection to see the same data
+        return get_pool(db).connection()
+    conns = getattr(_TLS, "conns", None)
+    if conns is None:
+        conns = _TLS.conns = _ThreadConnections()
+    conn = conns.get(db)
+    if conn is None:
+        conn = _make(db)
+        try:
+            _ensure(db, conn)
+        except BaseException:
+            with _ALL_CONNS_LOCK:
+                _ALL_CONNS.discard(conn)
+            sqlite3.Connection.close(conn)
+            raise
+        # Cached only once the schema is in place, so a failed init is retried
+        conns[db] = conn
+    return conn
+
+
+@atexit.register
+def _close_all():
+    with _ALL_CONNS_LOCK:
+        conns = list(_ALL_CONNS)
+        _ALL_CONNS.clear()
+    for conn in conns:
+        try:
+            sqlite3.Connection.close(conn)
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """
+    The single long-lived writer connection for one database (SQLite only
+    allows one at a time anyway, so writes queue on a lock instead of on
+    SQLITE_BUSY). It is opened lazily and shared across threads; reads use
+    the per-thread connections from get_read_conn(), which WAL lets run
+    alongside the writer. A ":memory:" database has only this connection,
+    which its reads share.
+
+    Fire-and-forget writes go through submit(): a background thread drains
+    the queue and applies everything pending in one BEGIN IMMEDIATE
+    transaction, so simultaneous writers never contend for the lock.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or DB_PATH
+        self._writer: Optional[sqlite3.Connection] = None
+        self._write_lock = threading.Lock()
+        self._open_lock = threading.Lock()
+        # (sql, params, many, future); sql None is a flush marker
+        self._write_queue: "queue.SimpleQueue[Tuple]" = queue.SimpleQueue()
+        self._write_thread: Optional[threading.Thread] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.db_path != ":memory:":
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False,
+                               cached_statements=_CACHED_STATEMENTS)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA cache_size=-65536")
+        conn.execute("PRAGMA foreign_keys=ON")
+        _ensure(self.db_path, conn)
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """The writer connection itself, opened on first use, without the lock."""
+        if self._writer is None:
+            with self._open_lock:
+                if self._writer is None:
+                    self._writer = self._connect()
+        return self._writer
+
+    @contextmanager
+    def writer(self):
+        """Exclusive use of the writer; commits on success, rolls back on error."""
+        with self._write_lock:
+            self.connection()
+            try:
+                yield self._writer
+                self._writer.commit()
+            except BaseException:
+                self._writer.rollback()
+                raise
+
+    def submit(self, sql: Optional[str], params=(), many: bool = False) -> Future:
+        """
+        Queue a write for the writer thread. The Future resolves once the
+        transaction containing it commits (or fails with its exception).
+        """
+        future: Future = Future()
+        self._write_queue.put((sql, params, many, future))
+        if self._write_thread is None:
+            with self._open_lock:
+                if self._write_thread is None:
+                    self._write_thread = threading.Thread(
+                        target=self._writer_loop, name="jarvis-sqlite-writer", daemon=True
+                    )
+                    self._write_thread.start()
+        return future
+
+    def flush(self):
+        """Block until every write submitted so far has been committed."""
+        if self._write_thread is not None:
+            self.submit(None).result()
+
+    def _writer_loop(self):
+        while True:
+            batch = [self._write_queue.get()]
+            while True:
+                try:
+                    batch.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._apply(batch)
+            except Exception:
+                # Isolate the failing write; the rest still go through
+                for item in batch:
+                    try:
+                        self._apply([item])
+                    except Exception as e:
+                        item[3].set_exception(e)
+
+    def _apply(self, batch: List[Tuple]):
+        with self.writer() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for sql, params, many, _ in batch:
+                if sql is None:
+                    continue
+                if many:
+                    conn.executemany(sql, params)
+                else:
+                    conn.execute(sql, params)
+        for *_, future in batch:
+            future.set_result(None)
+        _bump_version()
+
+
+_POOLS: Dict[str, ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_pool(db_path: str = None) -> ConnectionPool:
+    db = db_path or DB_PATH
+    pool = _POOLS.get(db)
+    if pool is None:
+        with _POOLS_LOCK:
+            pool = _POOLS.setdefault(db, ConnectionPool(db))
+    return pool
+
+
+def get_read_conn(db_path: str = None) -> sqlite3.Connection:
+    """
+    This thread's reader. WAL lets it run alongside the writer; it only
+    ever sees committed data.
+    """
+    return get_connection(db_path)
+
+
+def get_write_conn(db_path: str = None):
+    """
+    Context manager over the database's single writer connection. Callers
+    queue on its lock (never on SQLITE_BUSY); it commits when the block
+    exits and rolls back if it raises.
+    """
+    return get_pool(db_path).writer()
+
+
+@contextmanager
+def transaction(db_path: str = None):
+    """
+    The writer inside one BEGIN IMMEDIATE transaction, so a batch of writes
+    costs a single commit. Rolls back if the block raises.
+    """
+    with get_write_conn(db_path) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        yield conn
+
+
+@atexit.register
+def _flush_pools():
+    for pool in list(_POOLS.values()):
+        try:
+            pool.flush()
+        except Exception:
+            pass
+
+
+def _read(path: str) -> str:
+    if not os.path.exists(path):
+        return ""
+    with open(path) as f:
+        return f.read()
+
+
+def _run_script(conn: sqlite3.Connection, script: str):
+    """
+    Run a multi-statement script as one BEGIN IMMEDIATE transaction; left
+    to itself executescript() autocommits after every statement.
+    """
+    try:
+        conn.executescript(f"BEGIN IMMEDIATE;\n{script}\nCOMMIT;")
+    except sqlite3.Error:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+
+
+def init_db(db_path: str = None, conn: sqlite3.Connection = None):
+    """
+    Create all tables from schema.sql and run seed.sql. A fingerprint of
+    both (and of the FTS schema) is kept in PRAGMA user_version, so a
+    database already set up from these exact files is left untouched.
+    `conn` is the connection to set up (default: this thread's).
+    """
     db = db_path or DB_PATH
-    # Ensure directories exist
-    os.makedirs(os.path.dirname(db), exist_ok=True)
+    # Ensure directories exist (none for ":memory:" or a bare filename)
+    if db != ":memory:" and os.path.dirname(db):
+        os.makedirs(os.path.dirname(db), exist_ok=True)
     os.makedirs(os.path.join(BASE_DIR, 'logs'), exist_ok=True)
     os.makedirs(os.path.join(BASE_DIR, 'vault'), exist_ok=True)
-    conn = get_connection(db)
-    if os.path.exists(SCHEMA_PATH):
-        with open(SCHEMA_PATH) as f:
-            conn.executescript(f.read())
-    if os.path.exists(SEED_PATH):
-        with open(SEED_PATH) as f:
-            conn.executescript(f.read())
+    schema, seed = _read(SCHEMA_PATH), _read(SEED_PATH)
+    digest = hashlib.blake2b(
+        "\0".join((schema, seed, _FTS_SCHEMA if FTS5_AVAILABLE else "")).encode(),
+        digest_size=4,
+    ).digest()
+    fingerprint = int.from_bytes(digest, "big") & 0x7FFFFFFF
+    conn = conn or get_connection(db)
+    if conn.execute("PRAGMA user_version").fetchone()[0] == fingerprint:
+        return
+    if schema:
+        _run_script(conn, schema)
+    _migrate(conn)
     conn.commit()
-    conn.close()
+    if seed:
+        _run_script(conn, seed)
+    conn.execute(f"PRAGMA user_version = {fingerprint}")
+
+
+_INITED: set = set()
+_INITING: set = set()
+_INIT_LOCK = threading.RLock()
+
+
+def _ensure(db: str, conn: sqlite3.Connection = None):
+    """
+    Run init_db() once per database path, on first connection to it.
+    A ":memory:" database lives and dies with its connection, so each new
+    one is set up individually.
+    """
+    if db == ":memory:":
+        if conn is not None:
+            init_db(db, conn)
+        return
+    if db in _INITED:
+        return
+    with _INIT_LOCK:
+        # init_db() connects too; don't recurse from inside it
+        if db in _INITED or db in _INITING:
+            return
+        _INITING.add(db)
+        try:
+            init_db(db, conn)
+            _INITED.add(db)
+        finally:
+            _INITING.discard(db)
+
+
+def _fts5_available() -> bool:
+    try:
+        probe = sqlite3.connect(":memory:")
+        probe.execute("CREATE VIRTUAL TABLE t USING fts5(x)")
+        probe.close()
+        return True
+    except sqlite3.Error:
+        return False
+
+
+FTS5_AVAILABLE = _fts5_available()
+
+# Full-text index over memory_items, kept in sync by triggers. External
+# content: the text lives only in memory_items, the index holds postings.
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS memory_items_fts USING fts5(
+    title, body, tags,
+    content='memory_items', content_rowid='rowid',
+    tokenize='porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS memory_items_fts_ai AFTER INSERT ON memory_items BEGIN
+    INSERT INTO memory_items_fts(rowid, title, body, tags)
+    VALUES (new.rowid, new.title, new.body, new.tags);
+END;
+
+CREATE TRIGGER IF NOT EXISTS memory_items_fts_ad AFTER DELETE ON memory_items BEGIN
+    INSERT INTO memory_items_fts(memory_items_fts, rowid, title, body, tags)
+    VALUES ('delete', old.rowid, old.title, old.body, old.tags);
+END;
+
+CREATE TRIGGER IF NOT EXISTS memory_items_fts_au AFTER UPDATE OF title, body, tags ON memory_items BEGIN
+    INSERT INTO memory_items_fts(memory_items_fts, rowid, title, body, tags)
+    VALUES ('delete', old.rowid, old.title, old.body, old.tags);
+    INSERT INTO memory_items_fts(rowid, title, body, tags)
+    VALUES (new.rowid, new.title, new.body, new.tags);
+END;
+"""
+
+
+def _migrate(conn: sqlite3.Connection):
+    """Add columns and indexes introduced after a database was first created."""
+    tool_cols = {r["name"] for r in conn.execute("PRAGMA table_info(tools)")}
+    if "rw_set" not in tool_cols:
+        conn.execute("ALTER TABLE tools ADD COLUMN rw_set TEXT")
+    if "commutative" not in tool_cols:
+        conn.execute("ALTER TABLE tools ADD COLUMN commutative INTEGER DEFAULT 0")
+    if FTS5_AVAILABLE:
+        _run_script(conn, _FTS_SCHEMA)
+        # Index rows that predate the FTS table
+        behind = conn.execute(
+            """SELECT (SELECT COUNT(*) FROM memory_items_fts_docsize)
+                      != (SELECT COUNT(*) FROM memory_items)"""
+        ).fetchone()[0]
+        if behind:
+            conn.execute("INSERT INTO memory_items_fts(memory_items_fts) VALUES ('rebuild')")
 
 
 # ═══════════════════════════════════════════════════════════════════════
@@ -61,71 +507,89 @@ def init_db(db_path: str = None):
 
 def create_conversation(user_id: str = DEFAULT_USER, title: str = None,
                         mode: str = "text", db_path: str = None) -> str:
-    conn = get_connection(db_path)
     conv_id = _uid("conv_")
-    conn.execute(
-        "INSERT INTO conversations (conversation_id, user_id, title, mode) VALUES (?,?,?,?)",
-        (conv_id, user_id, title, mode)
-    )
-    conn.commit()
-    conn.close()
+    with get_write_conn(db_path) as conn:
+        conn.execute(
+            "INSERT INTO conversations (conversation_id, user_id, title, mode) VALUES (?,?,?,?)",
+            (conv_id, user_id, title, mode)
+        )
     return conv_id
 
 
 def end_conversation(conversation_id: str, db_path: str = None):
-    conn = get_connection(db_path)
-    conn.execute(
-        "UPDATE conversations SET ended_at = ? WHERE conversation_id = ?",
-        (datetime.now().isoformat(), conversation_id)
-    )
-    conn.commit()
-    conn.close()
+    with get_write_conn(db_path) as conn:
+        conn.execute(
+            "UPDATE conversations SET ended_at = ? WHERE conversation_id = ?",
+            (_now(), conversation_id)
+        )
 
 
 def add_message(conversation_id: str, role: str, content: str,
                 content_type: str = "text", tool_call_id: str = None,
                 tool_name: str = None, tool_input: str = None,
                 db_path: str = None) -> str:
-    conn = get_connection(db_path)
     msg_id = _uid("msg_")
-    conn.execute(
-        """INSERT INTO messages 
-           (message_id, conversation_id, role, content, content_type, 
-            tool_call_id, tool_name, tool_input) 
-           VALUES (?,?,?,?,?,?,?,?)""",
-        (msg_id, conversation_id, role, content, content_type,
-         tool_call_id, tool_name, tool_input)
-    )
-    conn.commit()
-    conn.close()
+    with get_write_conn(db_path) as conn:
+        conn.execute(
+            """INSERT INTO messages 
+               (message_id, conversation_id, role, content, content_type, 
+                tool_call_id, tool_name, tool_input) 
+               VALUES (?,?,?,?,?,?,?,?)""",
+            (msg_id, conversation_id, role, content, content_type,
+             tool_call_id, tool_name, tool_input)
+        )
     return msg_id
 
 
+def add_messages_bulk(conversation_id: str, msgs: List[Tuple],
+                      db_path: str = None) -> List[str]:
+    """
+    Insert several messages in one transaction. Each tuple is
+    (role, content[, content_type[, tool_call_id[, tool_name[, tool_input]]]]);
+    omitted fields take add_message()'s defaults. Returns the message_ids
+    in order.
+    """
+    defaults = ("text", None, None, None)
+    rows = []
+    for msg in msgs:
+        fields = tuple(msg) + defaults[len(msg) - 2:]
+        rows.append((_uid("msg_"), conversation_id) + fields)
+    with transaction(db_path) as conn:
+        conn.executemany(
+            """INSERT INTO messages 
+               (message_id, conversation_id, role, content, content_type, 
+                tool_call_id, tool_name, tool_input) 
+               VALUES (?,?,?,?,?,?,?,?)""",
+            rows
+        )
+    return [r[0] for r in rows]
+
+
 def get_conversation_messages(conversation_id: str, limit: int = 50,
-                               db_path: str = None) -> List[Dict]:
-    conn = get_connection(db_path)
-    rows = conn.execute(
+                               db_path: str = None) -> List[sqlite3.Row]:
+    """Rows support row["column"] and row.keys(); call dict(row) if a real dict is needed."""
+    conn = get_read_conn(db_path)
+    return conn.execute(
         """SELECT * FROM messages WHERE conversation_id = ? 
            ORDER BY created_at ASC LIMIT ?""",
         (conversation_id, limit)
     ).fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
 
 
 def get_recent_conversations(user_id: str = DEFAULT_USER, limit: int = 10,
                               db_path: str = None) -> List[Dict]:
-    conn = get_connection(db_path)
+    conn = get_read_conn(db_path)
     rows = conn.execute(
-        """SELECT c.*, COUNT(m.message_id) as msg_count
+        # Count only the returned rows through the messages(conversation_id)
+        # index instead of grouping the whole messages table
+        """SELECT c.*,
+                  (SELECT COUNT(*) FROM messages m
+                   WHERE m.conversation_id = c.conversation_id) AS msg_count
            FROM conversations c
-           LEFT JOIN messages m ON c.conversation_id = m.conversation_id
            WHERE c.user_id = ?
-           GROUP BY c.conversation_id
            ORDER BY c.started_at DESC LIMIT ?""",
         (user_id, limit)
     ).fetchall()
-    conn.close()
     return [dict(r) for r in rows]
 
 
@@ -134,85 +598,114 @@ def get_recent_conversations(user_id: str = DEFAULT_USER, limit: int = 10,
 # ═══════════════════════════════════════════════════════════════════════
 
 def get_tool_by_name(tool_name: str, db_path: str = None) -> Optional[Dict]:
-    conn = get_connection(db_path)
+    conn = get_read_conn(db_path)
     row = conn.execute(
         "SELECT * FROM tools WHERE tool_name = ? AND enabled = 1", (tool_name,)
     ).fetchone()
-    conn.close()
     return dict(row) if row else None
 
 
 def get_all_tools(db_path: str = None) -> List[Dict]:
-    conn = get_connection(db_path)
+    conn = get_read_conn(db_path)
     rows = conn.execute(
         "SELECT * FROM tools WHERE enabled = 1 ORDER BY tool_category, tool_name"
     ).fetchall()
-    conn.close()
     return [dict(r) for r in rows]
 
 
 def create_tool_run(conversation_id: str, tool_id: str, input_json: str,
                     message_id: str = None, status: str = "running",
                     db_path: str = None) -> str:
-    conn = get_connection(db_path)
     run_id = _uid("tr_")
-    conn.execute(
+    get_pool(db_path).submit(
         """INSERT INTO tool_runs 
            (tool_run_id, conversation_id, message_id, tool_id, status, input_json)
            VALUES (?,?,?,?,?,?)""",
         (run_id, conversation_id, message_id, tool_id, status, input_json)
     )
-    conn.commit()
-    conn.close()
     return run_id
 
 
 def complete_tool_run(tool_run_id: str, status: str, output_json: str = None,
                       error_text: str = None, duration_ms: int = None,
                       db_path: str = None):
-    conn = get_connection(db_path)
-    conn.execute(
+    get_pool(db_path).submit(
         """UPDATE tool_runs 
            SET status = ?, output_json = ?, error_text = ?, duration_ms = ?,
                finished_at = ?
            WHERE tool_run_id = ?""",
         (status, output_json, error_text, duration_ms,
-         datetime.now().isoformat(), tool_run_id)
+         utc_timestamp(), tool_run_id)
     )
-    conn.commit()
-    conn.close()
+
+
+def complete_tool_runs_batch(rows: List[Dict], db_path: str = None) -> Future:
+    """
+    Insert already-finished tool runs in one transaction. Each row holds
+    conversation_id, tool_id, status, input_json, output_json, error_text,
+    duration_ms and started_at, plus optionally its own tool_run_id and
+    finished_at; rows without a tool_run_id are given one. The insert is
+    queued on the pool's writer thread; the returned Future resolves when
+    it commits, or fails with its error.
+    """
+    for r in rows:
+        if not r.get("tool_run_id"):
+            r["tool_run_id"] = new_tool_run_id()
+    return get_pool(db_path).submit(
+        """INSERT INTO tool_runs
+           (tool_run_id, conversation_id, message_id, tool_id, status, input_json,
+            output_json, error_text, duration_ms, started_at, finished_at)
+           VALUES (?,?,?,?,?,?,?,?,?,?,?)""",
+        [(r["tool_run_id"], r["conversation_id"], r.get("message_id"), r["tool_id"],
+          r["status"], r["input_json"], r.get("output_json"), r.get("error_text"),
+          r.get("duration_ms"), r.get("started_at") or utc_timestamp(),
+          r.get("finished_at") or utc_timestamp())
+         for r in rows],
+        many=True,
+    )
+
+
+def record_tool_run(conversation_id: str, tool_id: str, status: str, input_json: str,
+                    output_json: str = None, error_text: str = None,
+                    duration_ms: int = None, started_at: str = None,
+                    message_id: str = None, db_path: str = None) -> str:
+    """Write a finished tool run as a single INSERT (no 'running' row first)."""
+    row = {
+        "conversation_id": conversation_id, "tool_id": tool_id, "status": status,
+        "input_json": input_json, "output_json": output_json, "error_text": error_text,
+        "duration_ms": duration_ms, "started_at": started_at, "message_id": message_id,
+    }
+    complete_tool_runs_batch([row], db_path=db_path)
+    return row["tool_run_id"]
 
 
 def create_approval(tool_run_id: str, user_id: str, prompt_text: str,
                     db_path: str = None) -> str:
-    conn = get_connection(db_path)
+    get_pool(db_path).flush()  # tool_run_id must be committed (FK)
     appr_id = _uid("appr_")
-    conn.execute(
-        """INSERT INTO approvals 
-           (approval_id, tool_run_id, user_id, prompt_text, decision)
-           VALUES (?,?,?,?,?)""",
-        (appr_id, tool_run_id, user_id, prompt_text, "pending")
-    )
-    conn.commit()
-    conn.close()
+    with get_write_conn(db_path) as conn:
+        conn.execute(
+            """INSERT INTO approvals 
+               (approval_id, tool_run_id, user_id, prompt_text, decision)
+               VALUES (?,?,?,?,?)""",
+            (appr_id, tool_run_id, user_id, prompt_text, "pending")
+        )
     return appr_id
 
 
 def resolve_approval(approval_id: str, decision: str, user_response: str = None,
                      db_path: str = None):
-    conn = get_connection(db_path)
-    conn.execute(
-        """UPDATE approvals 
-           SET decision = ?, user_response = ?, decided_at = ?
-           WHERE approval_id = ?""",
-        (decision, user_response, datetime.now().isoformat(), approval_id)
-    )
-    conn.commit()
-    conn.close()
+    with get_write_conn(db_path) as conn:
+        conn.execute(
+            """UPDATE approvals 
+               SET decision = ?, user_response = ?, decided_at = ?
+               WHERE approval_id = ?""",
+            (decision, user_response, _now(), approval_id)
+        )
 
 
 def get_pending_approvals(user_id: str = DEFAULT_USER, db_path: str = None) -> List[Dict]:
-    conn = get_connection(db_path)
+    conn = get_read_conn(db_path)
     rows = conn.execute(
         """SELECT a.*, tr.tool_id, tr.input_json, t.tool_name, t.risk_level
            FROM approvals a
@@ -222,23 +715,20 @@ def get_pending_approvals(user_id: str = DEFAULT_USER, db_path: str = None) -> L
            ORDER BY a.decided_at DESC""",
         (user_id,)
     ).fetchall()
-    conn.close()
     return [dict(r) for r in rows]
 
 
 def get_tool_run_stats(db_path: str = None) -> Dict:
-    conn = get_connection(db_path)
-    total = conn.execute("SELECT COUNT(*) as c FROM tool_runs").fetchone()["c"]
-    success = conn.execute(
-        "SELECT COUNT(*) as c FROM tool_runs WHERE status='success'"
-    ).fetchone()["c"]
+    conn = get_read_conn(db_path)
+    # One grouped scan; the overall totals are sums of the per-tool rows
     by_tool = conn.execute(
         """SELECT t.tool_name, COUNT(*) as count, 
-                  SUM(CASE WHEN tr.status='success' THEN 1 ELSE 0 END) as successes
+                  SUM(tr.status = 'success') as successes
            FROM tool_runs tr JOIN tools t ON tr.tool_id = t.tool_id
            GROUP BY t.tool_name ORDER BY count DESC"""
     ).fetchall()
-    conn.close()
+    total = sum(r["count"] for r in by_tool)
+    success = sum(r["successes"] for r in by_tool)
     return {
         "total_runs": total,
         "success_rate": round(success / total * 100, 1) if total > 0 else 0,
@@ -255,75 +745,182 @@ def store_memory(body: str, memory_type: str = "note", title: str = None,
                  source: str = "user", source_ref: str = None,
                  expires_at: str = None, user_id: str = DEFAULT_USER,
                  db_path: str = None) -> str:
-    conn = get_connection(db_path)
     mem_id = _uid("mem_")
-    conn.execute(
-        """INSERT INTO memory_items 
-           (memory_id, user_id, memory_type, title, body, tags, importance,
-            pin_status, source, source_ref, expires_at)
-           VALUES (?,?,?,?,?,?,?,?,?,?,?)""",
-        (mem_id, user_id, memory_type, title, body, tags, importance,
-         int(pin), source, source_ref, expires_at)
-    )
-    conn.commit()
-    conn.close()
+    with get_write_conn(db_path) as conn:
+        conn.execute(
+            """INSERT INTO memory_items 
+               (memory_id, user_id, memory_type, title, body, tags, importance,
+                pin_status, source, source_ref, expires_at)
+               VALUES (?,?,?,?,?,?,?,?,?,?,?)""",
+            (mem_id, user_id, memory_type, title, body, tags, importance,
+             int(pin), source, source_ref, expires_at)
+        )
+    _bump_version()
     return mem_id
 
 
+_SEARCH_MEMORIES_SQL = """SELECT * FROM memory_items
+    WHERE user_id = ?
+      AND (expires_at IS NULL OR expires_at > ? OR pin_status = 1)
+      AND (? IS NULL OR body LIKE ? OR title LIKE ?)
+      AND (? IS NULL OR memory_type = ?)
+      AND (? IS NULL OR importance >= ?){tags}
+    ORDER BY importance DESC, updated_at DESC LIMIT ?"""
+
+# Text and tag filters as one FTS5 MATCH instead of leading-% LIKE scans
+_SEARCH_MEMORIES_FTS_SQL = """SELECT m.* FROM memory_items_fts f
+    JOIN memory_items m ON m.rowid = f.rowid
+    WHERE memory_items_fts MATCH ?
+      AND m.user_id = ?
+      AND (m.expires_at IS NULL OR m.expires_at > ? OR m.pin_status = 1)
+      AND (? IS NULL OR m.memory_type = ?)
+      AND (? IS NULL OR m.importance >= ?)
+    ORDER BY m.importance DESC, m.updated_at DESC LIMIT ?"""
+
+# Tag filters are fixed NULL-tolerant slots, so every search with up to
+# _SEARCH_TAG_SLOTS tags runs the one statement built here at import
+_SEARCH_TAG_SLOTS = 4
+_TAG_SLOT = "\n      AND (? IS NULL OR tags LIKE ?)"
+_SEARCH_MEMORIES_STMTS: Dict[int, str] = {
+    _SEARCH_TAG_SLOTS: _SEARCH_MEMORIES_SQL.format(tags=_TAG_SLOT * _SEARCH_TAG_SLOTS),
+}
+
+
+def _search_memories_sql(n_slots: int) -> str:
+    sql = _SEARCH_MEMORIES_STMTS.get(n_slots)
+    if sql is None:
+        sql = _SEARCH_MEMORIES_STMTS[n_slots] = _SEARCH_MEMORIES_SQL.format(
+            tags=_TAG_SLOT * n_slots)
+    return sql
+
+
+def _fts_phrase(text: str) -> Optional[str]:
+    """Quote user text as an FTS5 phrase; None if it has nothing to index."""
+    if not any(ch.isalnum() for ch in text):
+        return None
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _fts_match(query: Optional[str], tags: List[str]) -> Optional[str]:
+    """
+    MATCH expression for a search: every query word as a prefix term, every
+    tag as a phrase on the tags column. None when a term can't be expressed,
+    so the caller falls back to LIKE.
+    """
+    terms = []
+    for word in (query or "").split():
+        phrase = _fts_phrase(word)
+        if phrase is None:
+            return None
+        terms.append(phrase + "*")
+    for tag in tags:
+        phrase = _fts_phrase(tag)
+        if phrase is None:
+            return None
+        terms.append("tags:" + phrase)
+    return " AND ".join(terms) or None
+
+
+def _search_memory_rows(query: str = None, memory_type: str = None,
+                        tags: str = None, min_importance: int = None,
+                        limit: int = 20, user_id: str = DEFAULT_USER,
+                        db_path: str = None) -> List[sqlite3.Row]:
+    conn = get_read_conn(db_path)
+    # Unused filters bind NULL so every call shares the same statement text
+    now = _now()
+    memory_type = memory_type or None
+    min_importance = min_importance or None
+    tag_list = [tag.strip() for tag in tags.split(",")] if tags else []
+    match = _fts_match(query, tag_list) if FTS5_AVAILABLE else None
+    if match:
+        rows = conn.execute(_SEARCH_MEMORIES_FTS_SQL, (
+            match, user_id, now, memory_type, memory_type,
+            min_importance, min_importance, limit,
+        )).fetchall()
+        return rows
+
+    pattern = f"%{query}%" if query else None
+    slots = max(_SEARCH_TAG_SLOTS, len(tag_list))
+    tag_params = []
+    for tag in tag_list + [None] * (slots - len(tag_list)):
+        tag_pattern = f"%{tag}%" if tag is not None else None
+        tag_params += [tag_pattern, tag_pattern]
+    params = [user_id, now,
+              pattern, pattern, pattern,
+              memory_type, memory_type,
+              min_importance, min_importance,
+              *tag_params, limit]
+    rows = conn.execute(_search_memories_sql(slots), params).fetchall()
+    return rows
+
+
+# Compact note view of a memory row; tags already split into a list
+NoteRow = namedtuple("NoteRow", "id text tags created_at")
+
+
 def search_memories(query: str = None, memory_type: str = None,
                     tags: str = None, min_importance: int = None,
                     limit: int = 20, user_id: str = DEFAULT_USER,
-                    db_path: str = None) -> List[Dict]:
-    conn = get_connection(db_path)
-    sql = "SELECT * FROM memory_items WHERE user_id = ?"
-    params: list = [user_id]
-    sql += " AND (expires_at IS NULL OR expires_at > ? OR pin_status = 1)"
-    params.append(datetime.now().isoformat())
-    if query:
-        sql += " AND (body LIKE ? OR title LIKE ?)"
-        params.extend([f"%{query}%", f"%{query}%"])
-    if memory_type:
-        sql += " AND memory_type = ?"
-        params.append(memory_type)
-    if tags:
-        for tag in tags.split(","):
-            sql += " AND tags LIKE ?"
-            params.append(f"%{tag.strip()}%")
-    if min_importance:
-        sql += " AND importance >= ?"
-        params.append(min_importance)
-    sql += " ORDER BY importance DESC, updated_at DESC LIMIT ?"
-    params.append(limit)
-    rows = conn.execute(sql, params).fetchall()
-    conn.close()
+                    db_path: str = None, as_note_rows: bool = False) -> List:
+    """Matching memories as dicts, or as NoteRow tuples with as_note_rows."""
+    rows = _search_memory_rows(query, memory_type, tags, min_importance,
+                               limit, user_id, db_path)
+    if as_note_rows:
+        return [NoteRow(r["memory_id"], r["body"],
+                        r["tags"].split(",") if r["tags"] else [], r["created_at"])
+                for r in rows]
+    return [dict(r) for r in rows]
+
+
+# Any query word may match; best BM25 score first (lower is better in FTS5)
+_RANK_MEMORIES_FTS_SQL = """SELECT m.* FROM memory_items_fts f
+    JOIN memory_items m ON m.rowid = f.rowid
+    WHERE memory_items_fts MATCH ?
+      AND m.user_id = ?
+      AND (m.expires_at IS NULL OR m.expires_at > ? OR m.pin_status = 1)
+    ORDER BY bm25(memory_items_fts) LIMIT ?"""
+
+
+def rank_memories(query: str, limit: int = 20, user_id: str = DEFAULT_USER,
+                  db_path: str = None) -> List[Dict]:
+    """
+    Memories relevant to free text, best first. Uses BM25 over the FTS index
+    with the query words OR'ed, so natural-language questions still match;
+    falls back to search_memories() without FTS5.
+    """
+    phrases = [_fts_phrase(word) for word in (query or "").split()]
+    match = " OR ".join(p + "*" for p in phrases if p)
+    if not (FTS5_AVAILABLE and match):
+        return search_memories(query=query, limit=limit, user_id=user_id,
+                               db_path=db_path)
+    rows = get_read_conn(db_path).execute(
+        _RANK_MEMORIES_FTS_SQL, (match, user_id, _now(), limit)
+    ).fetchall()
     return [dict(r) for r in rows]
 
 
 def get_memory(memory_id: str, db_path: str = None) -> Optional[Dict]:
-    conn = get_connection(db_path)
+    conn = get_read_conn(db_path)
     row = conn.execute(
         "SELECT * FROM memory_items WHERE memory_id = ?", (memory_id,)
     ).fetchone()
-    conn.close()
     return dict(row) if row else None
 
 
 def update_memory(memory_id: str, **kwargs) -> bool:
     db_path = kwargs.pop("db_path", None)
-    conn = get_connection(db_path)
     allowed = {"title", "body", "tags", "importance", "pin_status", "expires_at", "memory_type"}
     updates = {k: v for k, v in kwargs.items() if k in allowed and v is not None}
     if not updates:
-        conn.close()
         return False
-    updates["updated_at"] = datetime.now().isoformat()
+    updates["updated_at"] = _now()
     set_clause = ", ".join(f"{k} = ?" for k in updates)
     values = list(updates.values()) + [memory_id]
-    cursor = conn.execute(
-        f"UPDATE memory_items SET {set_clause} WHERE memory_id = ?", values
-    )
-    conn.commit()
-    conn.close()
+    with get_write_conn(db_path) as conn:
+        cursor = conn.execute(
+            f"UPDATE memory_items SET {set_clause} WHERE memory_id = ?", values
+        )
+    _bump_version()
     return cursor.rowcount > 0
 
 
@@ -332,68 +929,75 @@ def pin_memory(memory_id: str, db_path: str = None) -> bool:
 
 
 def delete_memory(memory_id: str, db_path: str = None) -> bool:
-    conn = get_connection(db_path)
-    cursor = conn.execute("DELETE FROM memory_items WHERE memory_id = ?", (memory_id,))
-    conn.commit()
-    conn.close()
+    with get_write_conn(db_path) as conn:
+        cursor = conn.execute("DELETE FROM memory_items WHERE memory_id = ?", (memory_id,))
+    _bump_version()
     return cursor.rowcount > 0
 
 
 def get_memory_stats(user_id: str = DEFAULT_USER, db_path: str = None) -> Dict:
-    conn = get_connection(db_path)
-    total = conn.execute(
-        "SELECT COUNT(*) as c FROM memory_items WHERE user_id = ?", (user_id,)
-    ).fetchone()["c"]
+    conn = get_read_conn(db_path)
     by_type = conn.execute(
-        "SELECT memory_type, COUNT(*) as count FROM memory_items WHERE user_id = ? GROUP BY memory_type",
+        """SELECT memory_type, COUNT(*) as count, SUM(pin_status = 1) as pinned
+           FROM memory_items WHERE user_id = ? GROUP BY memory_type""",
         (user_id,)
     ).fetchall()
-    pinned = conn.execute(
-        "SELECT COUNT(*) as c FROM memory_items WHERE user_id = ? AND pin_status = 1",
-        (user_id,)
-    ).fetchone()["c"]
-    conn.close()
-    return {"total": total, "pinned": pinned, "by_type": {r["memory_type"]: r["count"] for r in by_type}}
+    return {"total": sum(r["count"] for r in by_type),
+            "pinned": sum(r["pinned"] for r in by_type),
+            "by_type": {r["memory_type"]: r["count"] for r in by_type}}
 
 
 # ═══════════════════════════════════════════════════════════════════════
 # USER PREFERENCES
 # ═══════════════════════════════════════════════════════════════════════
 
+# (db path, user_id) -> (preferences as returned by get_all_preferences,
+# monotonic time loaded). Preferences are read constantly and written rarely.
+_PREF_CACHE: Dict[Tuple[str, str], Tuple[Dict, float]] = {}
+_PREF_CACHE_LOCK = threading.Lock()
+_PREF_TTL_S = 30.0
+
+
 def set_preference(key: str, value: str, source: str = "explicit",
                    confidence: float = 1.0, user_id: str = DEFAULT_USER,
                    db_path: str = None):
-    conn = get_connection(db_path)
-    conn.execute(
-        """INSERT OR REPLACE INTO user_preferences 
-           (user_id, pref_key, pref_value, confidence, source, updated_at) 
-           VALUES (?,?,?,?,?,?)""",
-        (user_id, key, value, confidence, source, datetime.now().isoformat())
-    )
-    conn.commit()
-    conn.close()
+    with get_write_conn(db_path) as conn:
+        conn.execute(
+            """INSERT OR REPLACE INTO user_preferences 
+               (user_id, pref_key, pref_value, confidence, source, updated_at) 
+               VALUES (?,?,?,?,?,?)""",
+            (user_id, key, value, confidence, source, _now())
+        )
+    with _PREF_CACHE_LOCK:
+        _PREF_CACHE.pop((db_path or DB_PATH, user_id), None)
+    _bump_version()
+
+
+def _preferences(user_id: str, db_path: str = None) -> Dict:
+    cache_key = (db_path or DB_PATH, user_id)
+    cached = _PREF_CACHE.get(cache_key)
+    if cached is not None and time.monotonic() - cached[1] < _PREF_TTL_S:
+        return cached[0]
+    conn = get_read_conn(db_path)
+    rows = conn.execute(
+        "SELECT pref_key, pref_value, confidence, source FROM user_preferences WHERE user_id = ? ORDER BY pref_key",
+        (user_id,)
+    ).fetchall()
+    prefs = {r["pref_key"]: {"value": r["pref_value"], "confidence": r["confidence"], "source": r["source"]}
+             for r in rows}
+    with _PREF_CACHE_LOCK:
+        _PREF_CACHE[cache_key] = (prefs, time.monotonic())
+    return prefs
 
 
 def get_preference(key: str, default: str = None, user_id: str = DEFAULT_USER,
                    db_path: str = None) -> Optional[str]:
-    conn = get_connection(db_path)
-    row = conn.execute(
-        "SELECT pref_value FROM user_preferences WHERE user_id = ? AND pref_key = ?",
-        (user_id, key)
-    ).fetchone()
-    conn.close()
-    return row["pref_value"] if row else default
+    pref = _preferences(user_id, db_path).get(key)
+    return pref["value"] if pref else default
 
 
 def get_all_preferences(user_id: str = DEFAULT_USER, db_path: str = None) -> Dict:
-    conn = get_connection(db_path)
-    rows = conn.execute(
-        "SELECT pref_key, pref_value, confidence, source FROM user_preferences WHERE user_id = ?",
-        (user_id,)
-    ).fetchall()
-    conn.close()
-    return {r["pref_key"]: {"value": r["pref_value"], "confidence": r["confidence"], "source": r["source"]}
-            for r in rows}
+    return {k: dict(v) for k, v in _preferences(user_id, db_path).items()}
 
 
 # ═══════════════════════════════════════════════════════════════════════
@@ -403,43 +1007,40 @@ def get_all_preferences(user_id: str = DEFAULT_USER, db_path: str = None) -> Dic
 def add_skill(name: str, description: str, steps_json: str,
               trigger_examples: str = None, user_id: str = DEFAULT_USER,
               db_path: str = None) -> str:
-    conn = get_connection(db_path)
     skill_id = _uid("skill_")
-    conn.execute(
-        """INSERT INTO skills 
-           (skill_id, user_id, name, description, trigger_examples, steps_json)
-           VALUES (?,?,?,?,?,?)""",
-        (skill_id, user_id, name, description, trigger_examples, steps_json)
-    )
-    conn.commit()
-    conn.close()
+    with get_write_conn(db_path) as conn:
+        conn.execute(
+            """INSERT INTO skills 
+               (skill_id, user_id, name, description, trigger_examples, steps_json)
+               VALUES (?,?,?,?,?,?)""",
+            (skill_id, user_id, name, description, trigger_examples, steps_json)
+        )
+    _bump_version()
     return skill_id
 
 
-def get_skills(user_id: str = DEFAULT_USER, db_path: str = None) -> List[Dict]:
-    conn = get_connection(db_path)
-    rows = conn.execute(
+def get_skills(user_id: str = DEFAULT_USER, db_path: str = None) -> List[sqlite3.Row]:
+    conn = get_read_conn(db_path)
+    return conn.execute(
         "SELECT * FROM skills WHERE user_id = ? ORDER BY times_used DESC", (user_id,)
     ).fetchall()
-    conn.close()
-    return [dict(r) for r in rows]
 
 
 def record_skill_use(skill_id: str, success: bool, db_path: str = None):
-    conn = get_connection(db_path)
-    skill = conn.execute("SELECT * FROM skills WHERE skill_id = ?", (skill_id,)).fetchone()
-    if skill:
-        times = skill["times_used"] + 1
-        successes = (skill["success_rate"] * skill["times_used"] + (1 if success else 0))
-        new_rate = successes / times if times > 0 else 0
-        conn.execute(
-            """UPDATE skills SET times_used = ?, success_rate = ?, 
-               last_used_at = ?, updated_at = ? WHERE skill_id = ?""",
-            (times, round(new_rate, 3), datetime.now().isoformat(),
-             datetime.now().isoformat(), skill_id)
+    with get_write_conn(db_path) as conn:
+        now = _now()
+        # Single UPDATE so concurrent uses can't lose each other's increment
+        cursor = conn.execute(
+            """UPDATE skills
+               SET success_rate = ROUND((COALESCE(success_rate, 0) * times_used + ?)
+                                        / (times_used + 1), 3),
+                   times_used = times_used + 1,
+                   last_used_at = ?, updated_at = ?
+               WHERE skill_id = ?""",
+            (1 if success else 0, now, now, skill_id)
         )
-        conn.commit()
-    conn.close()
+    if cursor.rowcount:
+        _bump_version()
 
 
 # ═══════════════════════════════════════════════════════════════════════
@@ -450,23 +1051,23 @@ def add_feedback(conversation_id: str, rating: int, user_id: str = DEFAULT_USER,
                  message_id: str = None, tool_run_id: str = None,
                  correction_text: str = None, label: str = None,
                  db_path: str = None) -> str:
-    conn = get_connection(db_path)
+    if tool_run_id:
+        get_pool(db_path).flush()  # queued tool_runs insert must land first (FK)
     fb_id = _uid("fb_")
-    conn.execute(
-        """INSERT INTO feedback 
-           (feedback_id, conversation_id, message_id, tool_run_id, 
-            user_id, rating, correction_text, label)
-           VALUES (?,?,?,?,?,?,?,?)""",
-        (fb_id, conversation_id, message_id, tool_run_id,
-         user_id, rating, correction_text, label)
-    )
-    conn.commit()
-    conn.close()
+    with get_write_conn(db_path) as conn:
+        conn.execute(
+            """INSERT INTO feedback 
+               (feedback_id, conversation_id, message_id, tool_run_id, 
+                user_id, rating, correction_text, label)
+               VALUES (?,?,?,?,?,?,?,?)""",
+            (fb_id, conversation_id, message_id, tool_run_id,
+             user_id, rating, correction_text, label)
+        )
     return fb_id
 
 
 def get_feedback_summary(user_id: str = DEFAULT_USER, db_path: str = None) -> Dict:
-    conn = get_connection(db_path)
+    conn = get_read_conn(db_path)
     row = conn.execute(
         "SELECT COUNT(*) as total, AVG(rating) as avg_rating FROM feedback WHERE user_id = ?",
         (user_id,)
@@ -475,7 +1076,6 @@ def get_feedback_summary(user_id: str = DEFAULT_USER, db_path: str = None) -> Di
         "SELECT label, COUNT(*) as count FROM feedback WHERE user_id = ? AND label IS NOT NULL GROUP BY label",
         (user_id,)
     ).fetchall()
-    conn.close()
     return {
         "total_feedback": row["total"],
         "avg_rating": round(row["avg_rating"] or 0, 2),
@@ -490,38 +1090,34 @@ def get_feedback_summary(user_id: str = DEFAULT_USER, db_path: str = None) -> Di
 def store_web_source(url: str, title: str = None, summary_memory_id: str = None,
                      raw_path: str = None, db_path: str = None) -> str:
     from urllib.parse import urlparse
-    conn = get_connection(db_path)
     source_id = _uid("web_")
     domain = urlparse(url).netloc
-    content_hash = hashlib.md5(url.encode()).hexdigest()
-    conn.execute(
-        """INSERT INTO web_sources 
-           (source_id, url, title, domain, content_hash, raw_path, summary_memory_id)
-           VALUES (?,?,?,?,?,?,?)""",
-        (source_id, url, title, domain, content_hash, raw_path, summary_memory_id)
-    )
-    conn.commit()
-    conn.close()
+    content_hash = hashlib.blake2b(url.encode(), digest_size=16).hexdigest()
+    with get_write_conn(db_path) as conn:
+        conn.execute(
+            """INSERT INTO web_sources 
+               (source_id, url, title, domain, content_hash, raw_path, summary_memory_id)
+               VALUES (?,?,?,?,?,?,?)""",
+            (source_id, url, title, domain, content_hash, raw_path, summary_memory_id)
+        )
     return source_id
 
 
 def add_contact(display_name: str, phone: str = None, email: str = None,
                 notes: str = None, user_id: str = DEFAULT_USER,
                 db_path: str = None) -> str:
-    conn = get_connection(db_path)
     cid = _uid("ct_")
-    conn.execute(
-        "INSERT INTO contacts (contact_id, user_id, display_name, phone_e164, email, notes) VALUES (?,?,?,?,?,?)",
-        (cid, user_id, display_name, phone, email, notes)
-    )
-    conn.commit()
-    conn.close()
+    with get_write_conn(db_path) as conn:
+        conn.execute(
+            "INSERT INTO contacts (contact_id, user_id, display_name, phone_e164, email, notes) VALUES (?,?,?,?,?,?)",
+            (cid, user_id, display_name, phone, email, notes)
+        )
     return cid
 
 
 def search_contacts(query: str = None, user_id: str = DEFAULT_USER,
                      db_path: str = None) -> List[Dict]:
-    conn = get_connection(db_path)
+    conn = get_read_conn(db_path)
     sql = "SELECT * FROM contacts WHERE user_id = ?"
     params: list = [user_id]
     if query:
@@ -529,7 +1125,6 @@ def search_contacts(query: str = None, user_id: str = DEFAULT_USER,
         params.extend([f"%{query}%"] * 3)
     sql += " ORDER BY display_name"
     rows = conn.execute(sql, params).fetchall()
-    conn.close()
     return [dict(r) for r in rows]
 
 
@@ -537,40 +1132,69 @@ def search_contacts(query: str = None, user_id: str = DEFAULT_USER,
 # CONTEXT BUILDER
 # ═══════════════════════════════════════════════════════════════════════
 
-def build_context(user_id: str = DEFAULT_USER, db_path: str = None) -> str:
-    parts = []
+# Everything build_context() renders, in one statement: one row per line,
+# tagged with its section and ordered within it
+_CONTEXT_SQL = """
+WITH pref_rows AS (
+    SELECT pref_key, pref_value, row_number() OVER (ORDER BY pref_key) AS ord
+    FROM user_preferences WHERE user_id = ?
+), mem_rows AS (
+    SELECT memory_type, title, body, pin_status, memory_id,
+           row_number() OVER (ORDER BY memory_id) AS ord
+    FROM (SELECT * FROM memory_items
+          WHERE user_id = ?
+            AND (expires_at IS NULL OR expires_at > ? OR pin_status = 1)
+            AND importance >= 4
+          ORDER BY importance DESC, updated_at DESC LIMIT 10)
+), run_rows AS (
+    SELECT t.tool_name, tr.status,
+           row_number() OVER (ORDER BY tr.started_at DESC) AS ord
+    FROM (SELECT tool_id, status, started_at FROM tool_runs
+          ORDER BY started_at DESC LIMIT 5) tr
+    JOIN tools t ON tr.tool_id = t.tool_id
+), skill_rows AS (
+    SELECT name, times_used, success_rate,
+           row_number() OVER (ORDER BY times_used DESC) AS ord
+    FROM skills WHERE user_id = ?
+    ORDER BY times_used DESC LIMIT 5
+)
+SELECT 0 AS section, ord, pref_key AS a, pref_value AS b, NULL AS c FROM pref_rows
+UNION ALL
+SELECT 1, ord, memory_type, COALESCE(NULLIF(title, ''), substr(body, 1, 80)), pin_status FROM mem_rows
+UNION ALL
+SELECT 2, ord, tool_name, status, NULL FROM run_rows
+UNION ALL
+SELECT 3, ord, name, times_used, success_rate FROM skill_rows
+ORDER BY section, ord
+"""
 
-    prefs = get_all_preferences(user_id, db_path)
-    if prefs:
-        parts.append("## User Preferences")
-        for k, v in prefs.items():
-            parts.append(f"- {k}: {v['value']}")
-
-    memories = search_memories(min_importance=4, limit=10, user_id=user_id, db_path=db_path)
-    if memories:
-        parts.append("\n## Key Memories")
-        for m in memories:
-            pin = "📌 " if m["pin_status"] else ""
-            parts.append(f"- {pin}[{m['memory_type']}] {m.get('title') or m['body'][:80]}")
-
-    conn = get_connection(db_path)
-    recent_runs = conn.execute(
-        """SELECT tr.*, t.tool_name FROM tool_runs tr
-           JOIN tools t ON tr.tool_id = t.tool_id
-           ORDER BY tr.started_at DESC LIMIT 5"""
+_CONTEXT_HEADINGS = ("## User Preferences", "\n## Key Memories",
+                     "\n## Recent Tool Activity", "\n## Learned Skills")
+
+
+def build_context(user_id: str = DEFAULT_USER, db_path: str = None) -> str:
+    conn = get_read_conn(db_path)
+    rows = conn.execute(
+        _CONTEXT_SQL, (user_id, user_id, _now(), user_id)
     ).fetchall()
-    conn.close()
-    if recent_runs:
-        parts.append("\n## Recent Tool Activity")
-        for r in recent_runs:
-            status_icon = "✓" if r["status"] == "success" else "✗"
-            parts.append(f"- [{status_icon}] {r['tool_name']}")
-
-    skills = get_skills(user_id, db_path)
-    if skills:
-        parts.append("\n## Learned Skills")
-        for s in skills[:5]:
-            parts.append(f"- {s['name']} (used {s['times_used']}x, {s['success_rate']:.0%} success)")
+
+    parts = []
+    section = None
+    for section_id, _, a, b, c in rows:
+        if section_id != section:
+            section = section_id
+            parts.append(_CONTEXT_HEADINGS[section])
+        if section == 0:
+            parts.append(f"- {a}: {b}")
+        elif section == 1:
+            # Memories come in stable id order so the text only changes when the set does
+            pin = "📌 " if c else ""
+            parts.append(f"- {pin}[{a}] {b}")
+        elif section == 2:
+            status_icon = "✓" if b == "success" else "✗"
+            parts.append(f"- [{status_icon}] {a}")
+        else:
+            parts.append(f"- {a} (used {b}x, {c:.0%} success)")
 
     return "\n".join(parts) if parts else "No memory context yet."
 
@@ -580,16 +1204,11 @@ def build_context(user_id: str = DEFAULT_USER, db_path: str = None) -> str:
 # ═══════════════════════════════════════════════════════════════════════
 
 def cleanup_expired(db_path: str = None) -> int:
-    conn = get_connection(db_path)
-    cursor = conn.execute(
-        "DELETE FROM memory_items WHERE expires_at IS NOT NULL AND expires_at < ? AND pin_status = 0",
-        (datetime.now().isoformat(),)
-    )
-    count = cursor.rowcount
-    conn.commit()
-    conn.close()
+    with get_write_conn(db_path) as conn:
+        cursor = conn.execute(
+            "DELETE FROM memory_items WHERE expires_at IS NOT NULL AND expires_at < ? AND pin_status = 0",
+            (_now(),)
+        )
+        count = cursor.rowcount
+    _bump_version()
     return count
-
-
-# Initialize on import
-init_db()
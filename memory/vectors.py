@@ -1,6 +1,7 @@
 """
 Jarvis v2 Vector Store
-Chroma-backed semantic search for memory items.
+Chroma-backed semantic search for memory items, or SQLiteVecStore to keep
+the vectors in the Jarvis database itself via the sqlite-vec extension.
 Keeps a registry in SQLite (memory_vectors) for auditability.
 
 Usage:
@@ -12,8 +13,16 @@ Usage:
 """
 
 import os
-import uuid
-from typing import Dict, List, Optional
+import json
+import time
+import atexit
+import hashlib
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
 CHROMA_AVAILABLE = False
@@ -24,6 +33,13 @@ try:
 except ImportError:
     pass
 
+SQLITE_VEC_AVAILABLE = False
+try:
+    import sqlite_vec
+    SQLITE_VEC_AVAILABLE = hasattr(sqlite3.Connection, "enable_load_extension")
+except ImportError:
+    pass
+
 OPENAI_AVAILABLE = False
 try:
     from openai import OpenAI
@@ -31,7 +47,8 @@ try:
 except ImportError:
     pass
 
-from memory.memory import get_connection, DB_PATH
+from memory.memory import get_read_conn, get_write_conn, DB_PATH, new_id
+from tools._policy_cache import get_policy_section
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 CHROMA_DIR = os.path.join(BASE_DIR, "memory", "chroma_db")
@@ -44,6 +61,82 @@ COLLECTION_FINANCE = "finance_research"
 EMBEDDING_MODEL = "text-embedding-3-small"
 EMBEDDING_DIM = 1536
 
+EMBED_CACHE_SIZE = 4096     # query/document embeddings kept in memory (LRU)
+EMBED_REQUEST_MAX = 256     # inputs per embeddings request
+EMBED_CONCURRENCY = 8       # embeddings requests in flight at once
+STORE_BATCH_MAX = 64        # deferred stores flushed once this many queue up...
+STORE_BATCH_WAIT_S = 0.05   # ...or this long after the first one arrived
+
+
+def _text_key(text: str) -> Tuple[str, bytes]:
+    return EMBEDDING_MODEL, hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+# (model, blake2b(text)) -> embedding packed as float32 bytes, least recently
+# used first. Shared by every VectorStore; packed vectors take ~6 KB instead
+# of the ~50 KB a 1536-float Python list costs.
+_EMBED_CACHE: "OrderedDict[Tuple[str, bytes], bytes]" = OrderedDict()
+_EMBED_CACHE_LOCK = threading.Lock()
+
+
+def _cache_get(key: Tuple[str, bytes]) -> Optional[List[float]]:
+    with _EMBED_CACHE_LOCK:
+        packed = _EMBED_CACHE.get(key)
+        if packed is None:
+            return None
+        _EMBED_CACHE.move_to_end(key)
+    return array("f", packed).tolist()
+
+
+def _cache_put(key: Tuple[str, bytes], embedding: List[float]):
+    packed = array("f", embedding).tobytes()
+    with _EMBED_CACHE_LOCK:
+        _EMBED_CACHE[key] = packed
+        _EMBED_CACHE.move_to_end(key)
+        if len(_EMBED_CACHE) > EMBED_CACHE_SIZE:
+            _EMBED_CACHE.popitem(last=False)
+
+
+# Process-wide clients: Chroma refuses two PersistentClients on one
+# directory, and each OpenAI client builds its own TLS/HTTP pool.
+_CLIENT_LOCK = threading.Lock()
+_CHROMA = None
+_OPENAI: Dict[str, "OpenAI"] = {}
+_COLLECTIONS: Dict[str, object] = {}
+
+
+def _get_chroma():
+    global _CHROMA
+    with _CLIENT_LOCK:
+        if _CHROMA is None:
+            _CHROMA = chromadb.PersistentClient(
+                path=CHROMA_DIR,
+                settings=Settings(anonymized_telemetry=False)
+            )
+        return _CHROMA
+
+
+def _get_collection(name: str):
+    coll = _COLLECTIONS.get(name)
+    if coll is None:
+        client = _get_chroma()
+        with _CLIENT_LOCK:
+            coll = _COLLECTIONS.get(name)
+            if coll is None:
+                coll = _COLLECTIONS[name] = client.get_or_create_collection(
+                    name=name,
+                    metadata={"hnsw:space": "cosine"}
+                )
+    return coll
+
+
+def _get_openai(api_key: str) -> "OpenAI":
+    with _CLIENT_LOCK:
+        client = _OPENAI.get(api_key)
+        if client is None:
+            client = _OPENAI[api_key] = OpenAI(api_key=api_key)
+        return client
+
 
 class VectorStore:
     """
@@ -56,44 +149,104 @@ class VectorStore:
         self.openai_client = None
         self.collections: Dict = {}
         self._available = False
+        # Deferred store() calls: (memory_id, text, collection, metadata, db_path)
+        self._pending: "deque[Tuple]" = deque()
+        self._in_flight = 0
+        self._pending_cv = threading.Condition()
+        self._batch_thread: Optional[threading.Thread] = None
+
+        self._open_backend()
 
+        if OPENAI_AVAILABLE:
+            key = api_key or os.environ.get("OPENAI_API_KEY")
+            if key:
+                self.openai_client = _get_openai(key)
+
+    def _open_backend(self):
         if CHROMA_AVAILABLE:
             try:
-                self.chroma_client = chromadb.PersistentClient(
-                    path=CHROMA_DIR,
-                    settings=Settings(anonymized_telemetry=False)
-                )
+                self.chroma_client = _get_chroma()
                 # Initialize collections
                 for name in [COLLECTION_MEMORIES, COLLECTION_SKILLS, COLLECTION_FINANCE]:
-                    self.collections[name] = self.chroma_client.get_or_create_collection(
-                        name=name,
-                        metadata={"hnsw:space": "cosine"}
-                    )
+                    self.collections[name] = _get_collection(name)
                 self._available = True
             except Exception as e:
                 print(f"[vectors] Chroma init failed: {e}")
 
-        if OPENAI_AVAILABLE:
-            key = api_key or os.environ.get("OPENAI_API_KEY")
-            if key:
-                self.openai_client = OpenAI(api_key=key)
-
     @property
     def available(self) -> bool:
         return self._available and self.openai_client is not None
 
     def _embed(self, text: str) -> List[float]:
-        """Get embedding from OpenAI."""
+        """Get embedding from OpenAI, or from the LRU if this text was seen."""
+        key = _text_key(text)
+        embedding = _cache_get(key)
+        if embedding is not None:
+            return embedding
         if not self.openai_client:
             raise RuntimeError("OpenAI client not initialized")
         response = self.openai_client.embeddings.create(
             model=EMBEDDING_MODEL,
             input=text
         )
-        return response.data[0].embedding
+        embedding = response.data[0].embedding
+        _cache_put(key, embedding)
+        return embedding
+
+    def _request_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """One embeddings API request (order preserved)."""
+        response = self.openai_client.embeddings.create(
+            model=EMBEDDING_MODEL,
+            input=texts
+        )
+        return [d.embedding for d in sorted(response.data, key=lambda d: d.index)]
+
+    def _cached_and_missing(self, texts: List[str]) -> Tuple[List[Tuple], List, List[int]]:
+        keys = [_text_key(t) for t in texts]
+        embeddings = [_cache_get(k) for k in keys]
+        missing = [i for i, e in enumerate(embeddings) if e is None]
+        if missing and not self.openai_client:
+            raise RuntimeError("OpenAI client not initialized")
+        return keys, embeddings, missing
+
+    def _fill(self, keys: List[Tuple], embeddings: List, missing: List[int],
+              fetched: List[List[float]]) -> List[List[float]]:
+        for i, embedding in zip(missing, fetched):
+            embeddings[i] = embedding
+            _cache_put(keys[i], embedding)
+        return embeddings
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed several texts (order preserved). Uncached texts go out in
+        requests of up to EMBED_REQUEST_MAX inputs; several requests run
+        concurrently over the shared client's keep-alive connections.
+        """
+        keys, embeddings, missing = self._cached_and_missing(texts)
+        if not missing:
+            return embeddings
+        chunks = [[texts[i] for i in missing[n:n + EMBED_REQUEST_MAX]]
+                  for n in range(0, len(missing), EMBED_REQUEST_MAX)]
+        if len(chunks) == 1:
+            results = [self._request_embeddings(chunks[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(EMBED_CONCURRENCY, len(chunks))) as pool:
+                results = list(pool.map(self._request_embeddings, chunks))
+        return self._fill(keys, embeddings, missing, [e for r in results for e in r])
+
+    def embed(self, text: str) -> Optional[List[float]]:
+        """Embed text for callers that keep their own vectors (e.g. response cache)."""
+        if not self.available:
+            return None
+        try:
+            return self._embed(text)
+        except Exception as e:
+            print(f"[vectors] Embed failed: {e}")
+            return None
 
     def store(self, memory_id: str, text: str, collection: str = COLLECTION_MEMORIES,
-              metadata: Dict = None, db_path: str = None) -> Optional[str]:
+              metadata: Dict = None, db_path: str = None,
+              defer: bool = False) -> Optional[str]:
         """
         Embed and store a document. Also registers in SQLite memory_vectors.
         
@@ -102,54 +255,123 @@ class VectorStore:
             text: The text to embed
             collection: Which Chroma collection
             metadata: Additional metadata for filtering
+            defer: Queue the store and return immediately; queued stores
+                   are embedded together through store_many()
         
         Returns:
-            vector_id if successful, None if unavailable
+            vector_id if successful, None if unavailable or deferred
         """
         if not self.available:
             return None
+        if defer:
+            self._enqueue((memory_id, text, collection, metadata, db_path))
+            return None
 
-        try:
-            embedding = self._embed(text)
-            chroma_id = f"vec_{uuid.uuid4().hex[:12]}"
+        return self.store_many([memory_id], [text], collection=collection,
+                               metadatas=[metadata], db_path=db_path)[0]
 
-            # Store in Chroma
+    def store_many(self, memory_ids: List[str], texts: List[str],
+                   collection: str = COLLECTION_MEMORIES,
+                   metadatas: List[Dict] = None, db_path: str = None) -> List[Optional[str]]:
+        """
+        Batch version of store(): one embeddings request, one Chroma upsert
+        and one SQLite transaction for all items.
+
+        Returns:
+            vector_ids aligned with memory_ids (all None if unavailable)
+        """
+        if not self.available or not memory_ids:
+            return [None] * len(memory_ids)
+
+        try:
             coll = self.collections.get(collection)
             if not coll:
-                return None
+                return [None] * len(memory_ids)
 
-            meta = metadata or {}
-            meta["memory_id"] = memory_id
-            meta["stored_at"] = datetime.now().isoformat()
-            # Chroma metadata values must be str, int, float, or bool
-            clean_meta = {k: str(v) if v is not None else "" for k, v in meta.items()}
+            embeddings = self._embed_batch(texts)
+            metadatas = metadatas or [None] * len(memory_ids)
+            now = datetime.now().isoformat()
+
+            chroma_ids, clean_metas = [], []
+            for memory_id, metadata in zip(memory_ids, metadatas):
+                chroma_ids.append(new_id("vec_"))
+                meta = dict(metadata or {})
+                meta["memory_id"] = memory_id
+                meta["stored_at"] = now
+                clean_metas.append({k: str(v) if v is not None else "" for k, v in meta.items()})
 
             coll.upsert(
-                ids=[chroma_id],
-                embeddings=[embedding],
-                documents=[text],
-                metadatas=[clean_meta]
+                ids=chroma_ids,
+                embeddings=embeddings,
+                documents=list(texts),
+                metadatas=clean_metas
             )
 
-            # Register in SQLite
-            vector_id = f"vecr_{uuid.uuid4().hex[:12]}"
-            conn = get_connection(db_path)
-            conn.execute(
-                """INSERT OR REPLACE INTO memory_vectors 
-                   (vector_id, memory_id, provider, collection_name, 
-                    embedding_model, dimension, external_ref)
-                   VALUES (?,?,?,?,?,?,?)""",
-                (vector_id, memory_id, "chroma", collection,
-                 EMBEDDING_MODEL, EMBEDDING_DIM, chroma_id)
-            )
-            conn.commit()
-            conn.close()
+            vector_ids = [new_id("vecr_") for _ in memory_ids]
+            with get_write_conn(db_path) as conn:
+                conn.executemany(
+                    """INSERT OR REPLACE INTO memory_vectors 
+                       (vector_id, memory_id, provider, collection_name, 
+                        embedding_model, dimension, external_ref)
+                       VALUES (?,?,?,?,?,?,?)""",
+                    [(vid, mid, "chroma", collection, EMBEDDING_MODEL, EMBEDDING_DIM, cid)
+                     for vid, mid, cid in zip(vector_ids, memory_ids, chroma_ids)]
+                )
 
-            return vector_id
+            return vector_ids
 
         except Exception as e:
-            print(f"[vectors] Store failed: {e}")
-            return None
+            print(f"[vectors] Batch store failed: {e}")
+            return [None] * len(memory_ids)
+
+    def _enqueue(self, item: Tuple):
+        with self._pending_cv:
+            self._pending.append(item)
+            self._pending_cv.notify_all()
+            if self._batch_thread is None:
+                self._batch_thread = threading.Thread(
+                    target=self._batch_loop, name="jarvis-embed-batch", daemon=True
+                )
+                self._batch_thread.start()
+                atexit.register(self.flush)
+
+    def _batch_loop(self):
+        while True:
+            with self._pending_cv:
+                while not self._pending:
+                    self._pending_cv.wait()
+                # Give later stores a moment to join this batch
+                deadline = time.monotonic() + STORE_BATCH_WAIT_S
+                while len(self._pending) < STORE_BATCH_MAX:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._pending_cv.wait(remaining)
+                batch = [self._pending.popleft()
+                         for _ in range(min(STORE_BATCH_MAX, len(self._pending)))]
+                self._in_flight += len(batch)
+            try:
+                self._store_batch(batch)
+            finally:
+                with self._pending_cv:
+                    self._in_flight -= len(batch)
+                    self._pending_cv.notify_all()
+
+    def _store_batch(self, batch: List[Tuple]):
+        """store_many() once per (collection, db_path) in the batch."""
+        groups: Dict[Tuple, List[Tuple]] = {}
+        for memory_id, text, collection, metadata, db_path in batch:
+            groups.setdefault((collection, db_path), []).append((memory_id, text, metadata))
+        for (collection, db_path), items in groups.items():
+            memory_ids, texts, metadatas = map(list, zip(*items))
+            self.store_many(memory_ids, texts, collection=collection,
+                            metadatas=metadatas, db_path=db_path)
+
+    def flush(self):
+        """Block until every deferred store() has been written."""
+        with self._pending_cv:
+            while self._pending or self._in_flight:
+                self._pending_cv.wait()
 
     def search(self, query: str, collection: str = COLLECTION_MEMORIES,
                top_k: int = 5, where: Dict = None) -> List[Dict]:
@@ -164,6 +386,19 @@ class VectorStore:
 
         try:
             embedding = self._embed(query)
+        except Exception as e:
+            print(f"[vectors] Search failed: {e}")
+            return []
+        return self.search_by_vector(embedding, collection=collection,
+                                     top_k=top_k, where=where)
+
+    def search_by_vector(self, embedding: List[float], collection: str = COLLECTION_MEMORIES,
+                         top_k: int = 5, where: Dict = None) -> List[Dict]:
+        """Like search(), but for callers that already hold the query embedding."""
+        if not self.available:
+            return []
+
+        try:
             coll = self.collections.get(collection)
             if not coll:
                 return []
@@ -202,7 +437,7 @@ class VectorStore:
 
         try:
             # Find in SQLite registry
-            conn = get_connection(db_path)
+            conn = get_read_conn(db_path)
             rows = conn.execute(
                 "SELECT external_ref, collection_name FROM memory_vectors WHERE memory_id = ?",
                 (memory_id,)
@@ -216,9 +451,8 @@ class VectorStore:
                     except Exception:
                         pass
 
-            conn.execute("DELETE FROM memory_vectors WHERE memory_id = ?", (memory_id,))
-            conn.commit()
-            conn.close()
+            with get_write_conn(db_path) as conn:
+                conn.execute("DELETE FROM memory_vectors WHERE memory_id = ?", (memory_id,))
             return True
 
         except Exception as e:
@@ -237,3 +471,256 @@ class VectorStore:
             except Exception:
                 stats["collections"][name] = {"count": 0}
         return stats
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# SQLITE-VEC BACKEND
+# ═══════════════════════════════════════════════════════════════════════
+
+_VEC_SCHEMA = """
+CREATE TABLE IF NOT EXISTS vec_documents (
+    rowid INTEGER PRIMARY KEY,
+    collection_name TEXT NOT NULL,
+    memory_id TEXT NOT NULL,
+    document TEXT,
+    metadata TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_vec_documents_memory
+    ON vec_documents(memory_id, collection_name);
+"""
+
+# Nearest rows of one collection's vec0 table, joined back to their documents.
+# Optional metadata filters are applied to the k nearest.
+_VEC_SEARCH_SQL = """WITH knn AS (
+        SELECT rowid, distance FROM {table} WHERE embedding MATCH ? AND k = ?
+    )
+    SELECT d.memory_id, d.document, d.metadata, knn.distance
+    FROM knn JOIN vec_documents d ON d.rowid = knn.rowid{filters}
+    ORDER BY knn.distance LIMIT ?"""
+
+_VEC_LOCK = threading.Lock()
+# (db_path, collection) pairs whose tables exist
+_VEC_READY: set = set()
+
+
+def _vec(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """
+    Load sqlite-vec into a connection on first use. Connections are cached
+    per thread and per pool, so loading is a one-time cost for each.
+    """
+    try:
+        conn.execute("SELECT vec_version()")
+    except sqlite3.OperationalError:
+        conn.enable_load_extension(True)
+        try:
+            sqlite_vec.load(conn)
+        finally:
+            conn.enable_load_extension(False)
+    return conn
+
+
+def _vec_table(collection: str) -> str:
+    if not collection.isidentifier():
+        raise ValueError(f"invalid collection name: {collection!r}")
+    return f"vec_{collection}"
+
+
+def _pack(embedding: List[float]) -> bytes:
+    return array("f", embedding).tobytes()
+
+
+class SQLiteVecStore(VectorStore):
+    """
+    VectorStore whose vectors live next to memory_items in the Jarvis SQLite
+    file (one sqlite-vec vec0 table per collection) instead of in Chroma.
+    Same interface, embeddings and deferred-store batching.
+    """
+
+    def _open_backend(self):
+        self.collections = {name: _vec_table(name) for name in
+                            (COLLECTION_MEMORIES, COLLECTION_SKILLS, COLLECTION_FINANCE)}
+        self._available = SQLITE_VEC_AVAILABLE
+
+    def _ensure_tables(self, collection: str, db_path: str = None) -> str:
+        table = _vec_table(collection)
+        key = (db_path or DB_PATH, collection)
+        if key not in _VEC_READY:
+            with _VEC_LOCK, get_write_conn(db_path) as conn:
+                _vec(conn).executescript(_VEC_SCHEMA)
+                conn.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING vec0("
+                    f"embedding float[{EMBEDDING_DIM}] distance_metric=cosine)"
+                )
+                _VEC_READY.add(key)
+        return table
+
+    def store_many(self, memory_ids: List[str], texts: List[str],
+                   collection: str = COLLECTION_MEMORIES,
+                   metadatas: List[Dict] = None, db_path: str = None) -> List[Optional[str]]:
+        """
+        Batch store: one embeddings request and one transaction covering the
+        documents, their vectors and the memory_vectors registry. Storing a
+        memory_id again replaces its vector in that collection.
+        """
+        if not self.available or not memory_ids:
+            return [None] * len(memory_ids)
+
+        try:
+            table = self._ensure_tables(collection, db_path)
+            embeddings = self._embed_batch(texts)
+            metadatas = metadatas or [None] * len(memory_ids)
+            now = datetime.now().isoformat()
+
+            vector_ids = [new_id("vecr_") for _ in memory_ids]
+            with get_write_conn(db_path) as conn:
+                _vec(conn)
+                self._delete_rows(conn, memory_ids, collection)
+                registry = []
+                for vid, memory_id, text, embedding, metadata in zip(
+                        vector_ids, memory_ids, texts, embeddings, metadatas):
+                    meta = dict(metadata or {})
+                    meta["memory_id"] = memory_id
+                    meta["stored_at"] = now
+                    meta = {k: str(v) if v is not None else "" for k, v in meta.items()}
+                    rowid = conn.execute(
+                        """INSERT INTO vec_documents
+                           (collection_name, memory_id, document, metadata)
+                           VALUES (?,?,?,?)""",
+                        (collection, memory_id, text, json.dumps(meta))
+                    ).lastrowid
+                    conn.execute(f"INSERT INTO {table}(rowid, embedding) VALUES (?, ?)",
+                                 (rowid, _pack(embedding)))
+                    registry.append((vid, memory_id, "sqlite-vec", collection,
+                                     EMBEDDING_MODEL, EMBEDDING_DIM, str(rowid)))
+                conn.executemany(
+                    """INSERT OR REPLACE INTO memory_vectors 
+                       (vector_id, memory_id, provider, collection_name, 
+                        embedding_model, dimension, external_ref)
+                       VALUES (?,?,?,?,?,?,?)""",
+                    registry
+                )
+
+            return vector_ids
+
+        except Exception as e:
+            print(f"[vectors] Batch store failed: {e}")
+            return [None] * len(memory_ids)
+
+    def search_by_vector(self, embedding: List[float], collection: str = COLLECTION_MEMORIES,
+                         top_k: int = 5, where: Dict = None) -> List[Dict]:
+        """
+        Like search(), but for callers that already hold the query embedding.
+        `where` supports flat {metadata_key: value} equality only.
+        """
+        if not self.available:
+            return []
+
+        try:
+            table = self._ensure_tables(collection)
+            where = where or {}
+            filters = "".join(
+                f"\n    {'WHERE' if i == 0 else 'AND'} json_extract(d.metadata, ?) = ?"
+                for i in range(len(where))
+            )
+            params: List = [_pack(embedding), top_k * 4 if where else top_k]
+            for key, value in where.items():
+                params += [f"$.{key}", str(value)]
+            params.append(top_k)
+
+            conn = _vec(get_read_conn())
+            rows = conn.execute(
+                _VEC_SEARCH_SQL.format(table=table, filters=filters), params
+            ).fetchall()
+            return [
+                {
+                    "memory_id": row["memory_id"],
+                    "text": row["document"] or "",
+                    "score": 1 - row["distance"],
+                    "metadata": json.loads(row["metadata"] or "{}"),
+                }
+                for row in rows
+            ]
+
+        except Exception as e:
+            print(f"[vectors] Search failed: {e}")
+            return []
+
+    def _delete_rows(self, conn: sqlite3.Connection, memory_ids: List[str],
+                     collection: str = None):
+        """Drop documents and vectors for memory_ids (all collections if None)."""
+        placeholders = ",".join("?" * len(memory_ids))
+        sql = f"SELECT rowid, collection_name FROM vec_documents WHERE memory_id IN ({placeholders})"
+        params = list(memory_ids)
+        if collection is not None:
+            sql += " AND collection_name = ?"
+            params.append(collection)
+        rows = conn.execute(sql, params).fetchall()
+        for row in rows:
+            conn.execute(f"DELETE FROM {_vec_table(row['collection_name'])} WHERE rowid = ?",
+                         (row["rowid"],))
+        conn.executemany("DELETE FROM vec_documents WHERE rowid = ?",
+                         [(row["rowid"],) for row in rows])
+
+    def delete(self, memory_id: str, collection: str = COLLECTION_MEMORIES,
+               db_path: str = None) -> bool:
+        """Delete all vectors associated with a memory_id."""
+        if not self.available:
+            return False
+
+        try:
+            self._ensure_tables(collection, db_path)
+            with get_write_conn(db_path) as conn:
+                self._delete_rows(_vec(conn), [memory_id])
+                conn.execute("DELETE FROM memory_vectors WHERE memory_id = ?", (memory_id,))
+            return True
+
+        except Exception as e:
+            print(f"[vectors] Delete failed: {e}")
+            return False
+
+    def stats(self) -> Dict:
+        """Get vector store statistics."""
+        if not self.available:
+            return {"available": False, "reason": "sqlite-vec or OpenAI not configured"}
+
+        stats = {"available": True, "backend": "sqlite-vec", "collections": {}}
+        counts = {}
+        try:
+            counts = dict(get_read_conn().execute(
+                "SELECT collection_name, COUNT(*) FROM vec_documents GROUP BY collection_name"
+            ).fetchall())
+        except sqlite3.OperationalError:
+            pass  # nothing stored yet
+        for name in self.collections:
+            stats["collections"][name] = {"count": counts.get(name, 0)}
+        return stats
+
+
+# Selectable with `memory.vector_backend` in policies.yaml
+VECTOR_BACKENDS = {
+    "chroma": VectorStore,
+    "sqlite-vec": SQLiteVecStore,
+}
+
+_STORE: Optional[VectorStore] = None
+_STORE_LOADED = False
+_STORE_LOCK = threading.Lock()
+
+
+def get_vector_store() -> Optional[VectorStore]:
+    """
+    The process-wide store for the configured backend, created on first
+    use; None if it can't be. Shared so every caller searches (and
+    flushes) the same queue of deferred embeds.
+    """
+    global _STORE, _STORE_LOADED
+    if not _STORE_LOADED:
+        with _STORE_LOCK:
+            if not _STORE_LOADED:
+                try:
+                    backend = get_policy_section("memory").get("vector_backend", "chroma")
+                    _STORE = VECTOR_BACKENDS[backend]()
+                except Exception:
+                    _STORE = None
+                _STORE_LOADED = True
+    return _STORE
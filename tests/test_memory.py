@@ -0,0 +1,23 @@
+import threading
+import unittest
+
+from memory.memory import get_memory, search_memories, store_memory
+
+
+class InMemoryDatabaseTest(unittest.TestCase):
+    def test_reads_see_writes(self):
+        mid = store_memory("hello world body", db_path=":memory:")
+        self.assertEqual(get_memory(mid, db_path=":memory:")["body"], "hello world body")
+        self.assertIn(mid, [m["memory_id"] for m in search_memories(db_path=":memory:")])
+
+    def test_other_threads_see_writes(self):
+        mid = store_memory("written on the main thread", db_path=":memory:")
+        found = []
+        reader = threading.Thread(target=lambda: found.append(get_memory(mid, db_path=":memory:")))
+        reader.start()
+        reader.join()
+        self.assertIsNotNone(found[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+"""Shared, mtime-checked cache of configs/policies.yaml.
+
+Tools read their policy section on every call; parsing the YAML each time
+dominated the cost of cheap actions. The parsed file is kept per path and
+re-read only when its modification time changes, so edits still apply to
+the next call without a restart.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Dict, Tuple
+
+POLICIES_PATH = os.path.join(os.path.dirname(__file__), "..", "configs", "policies.yaml")
+
+# path -> (mtime, parsed document)
+_CACHE: Dict[str, Tuple[float, Dict]] = {}
+_LOCK = threading.Lock()
+
+# (yaml module, loader class), imported on the first parse so importing a
+# tool doesn't pull in PyYAML
+_yaml = None
+
+
+def _get_yaml():
+    global _yaml
+    if _yaml is None:
+        import yaml
+        # libyaml's C loader parses several times faster; same safe subset
+        _yaml = (yaml, getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+    return _yaml
+
+
+def load_policies(path: str = POLICIES_PATH) -> Dict:
+    """The whole parsed file ({} if missing or invalid). Treat as read-only."""
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return {}
+    cached = _CACHE.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with _LOCK:
+        cached = _CACHE.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        try:
+            yaml, loader = _get_yaml()
+            with open(path, "r") as f:
+                cfg = yaml.load(f, Loader=loader) or {}
+        except Exception:
+            cfg = {}
+        _CACHE[path] = (mtime, cfg)
+        return cfg
+
+
+def get_policy_section(section: str, path: str = POLICIES_PATH) -> Dict:
+    """One top-level section of policies.yaml ({} if absent). Treat as read-only."""
+    return load_policies(path).get(section, {}) or {}
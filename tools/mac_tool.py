@@ -5,37 +5,57 @@ Runs only on macOS; elsewhere returns a helpful error.
 
 from __future__ import annotations
 
+import json
 import os
 import platform
 import subprocess
+from types import MappingProxyType
 from typing import Dict
 
-import yaml
+from tools._policy_cache import get_policy_section
 
-POLICIES_PATH = os.path.join(os.path.dirname(__file__), "..", "configs", "policies.yaml")
+
+# Fixed error results, shared and read-only
+_ERR_DISABLED = MappingProxyType({"success": False, "error": "mac tool is disabled by policy"})
+_ERR_NOT_MACOS = MappingProxyType({"success": False, "error": "mac_control is only available on macOS"})
+_ERR_NO_APP = MappingProxyType({"success": False, "error": "app is required"})
+_ERR_NO_URL = MappingProxyType({"success": False, "error": "url is required"})
+_ERR_NO_MESSAGE = MappingProxyType({"success": False, "error": "message is required"})
+
+
+# The OS can't change while we run
+_IS_MACOS = platform.system().lower() == "darwin"
 
 
 def _load_policy() -> Dict:
-    try:
-        with open(POLICIES_PATH, "r") as f:
-            cfg = yaml.safe_load(f) or {}
-        return cfg.get("mac", {}) or {}
-    except Exception:
-        return {}
+    return get_policy_section("mac")
 
 
 def _ensure_macos() -> bool:
-    return platform.system().lower() == "darwin"
+    return _IS_MACOS
+
+
+def _run(argv, input: str = None) -> subprocess.CompletedProcess:
+    # Fully buffered pipes (bufsize=-1): output is drained in large reads
+    return subprocess.run(argv, input=input, stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE, text=True, bufsize=-1)
+
+
+def _jxa(script: str) -> subprocess.CompletedProcess:
+    """Run JavaScript for Automation, passed on stdin rather than argv."""
+    return _run(["osascript", "-l", "JavaScript", "-"], input=script)
 
 
-def _osascript(script: str) -> subprocess.CompletedProcess:
-    return subprocess.run(["osascript", "-e", script], capture_output=True, text=True)
+# Strings are embedded as JSON literals, which JavaScript parses as-is
+_NOTIFY_JXA = ("var app = Application.currentApplication();"
+               " app.includeStandardAdditions = true;"
+               " app.displayNotification({message}, {{withTitle: {title}}});")
 
 
 def run(action: str, **kwargs) -> Dict:
     policy = _load_policy()
     if not policy.get("enabled", True):
-        return {"success": False, "error": "mac tool is disabled by policy"}
+        return _ERR_DISABLED
 
     action = (action or "").strip()
     allowed = set(policy.get("allowed_actions", []) or [])
@@ -44,35 +64,35 @@ def run(action: str, **kwargs) -> Dict:
         return {"success": False, "error": f"action '{action}' not allowed by policy"}
 
     if not _ensure_macos():
-        return {"success": False, "error": "mac_control is only available on macOS"}
+        return _ERR_NOT_MACOS
 
     try:
         if action == "open_app":
             app = kwargs.get("app") or kwargs.get("name")
             if not app:
-                return {"success": False, "error": "app is required"}
-            proc = subprocess.run(["open", "-a", app], capture_output=True, text=True)
+                return _ERR_NO_APP
+            proc = _run(["open", "-a", app])
             return {"success": proc.returncode == 0, "output": proc.stdout.strip(), "error": proc.stderr.strip()}
 
         if action == "open_url":
             url = kwargs.get("url")
             if not url:
-                return {"success": False, "error": "url is required"}
-            proc = subprocess.run(["open", url], capture_output=True, text=True)
+                return _ERR_NO_URL
+            proc = _run(["open", url])
             return {"success": proc.returncode == 0, "output": proc.stdout.strip(), "error": proc.stderr.strip()}
 
         if action == "notify":
             title = kwargs.get("title", "Jarvis")
             message = kwargs.get("message", "")
             if not message:
-                return {"success": False, "error": "message is required"}
-            script = f'display notification {message!r} with title {title!r}'
-            proc = _osascript(script)
+                return _ERR_NO_MESSAGE
+            script = _NOTIFY_JXA.format(message=json.dumps(message), title=json.dumps(str(title)))
+            proc = _jxa(script)
             return {"success": proc.returncode == 0, "output": proc.stdout.strip(), "error": proc.stderr.strip()}
 
         if action == "screenshot":
             path = kwargs.get("path") or os.path.join(os.path.expanduser("~"), "Desktop", "jarvis_screenshot.png")
-            proc = subprocess.run(["screencapture", "-x", path], capture_output=True, text=True)
+            proc = _run(["screencapture", "-x", path])
             return {"success": proc.returncode == 0, "output": path if proc.returncode == 0 else "", "error": proc.stderr.strip()}
 
         return {"success": False, "error": f"Unknown action: {action}"}
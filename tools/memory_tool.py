@@ -4,25 +4,70 @@ LLM-callable tool for storing, querying, pinning, and deleting memories.
 Integrates both SQLite and Chroma vector search.
 """
 
-from typing import Dict
+import functools
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+from types import MappingProxyType
+from typing import Dict, List, Tuple
 from memory.memory import (
-    store_memory, search_memories, get_memory, update_memory,
+    store_memory, search_memories, rank_memories, get_memory, update_memory,
     pin_memory, delete_memory, get_memory_stats
 )
 
-# Lazy-loaded vector store (initialized on first use)
-_vector_store = None
+# Fixed error results, shared and read-only
+_ERR_NO_BODY = MappingProxyType({"success": False, "error": "body is required"})
+_ERR_NO_QUERY = MappingProxyType({"success": False, "error": "query is required for semantic search"})
+_ERR_NO_MEMORY_ID = MappingProxyType({"success": False, "error": "memory_id is required"})
+
+
+# Reciprocal Rank Fusion constant: score(d) = sum(1 / (RRF_K + rank))
+RRF_K = 60
+
+# Runs the keyword half of a semantic search while the caller embeds the query
+_SEARCH_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memsearch")
 
 
 def _get_vectors():
-    global _vector_store
-    if _vector_store is None:
-        try:
-            from memory.vectors import VectorStore
-            _vector_store = VectorStore()
-        except Exception:
-            _vector_store = False  # Mark as unavailable
-    return _vector_store if _vector_store else None
+    from memory.vectors import get_vector_store
+    return get_vector_store()
+
+
+BODY_PREVIEW = 300  # chars of a memory body returned to the model
+
+
+def _project_memory(m: Dict) -> Dict:
+    """The fields of a memory_items row that the query action returns."""
+    body = m["body"]
+    preview = body[:BODY_PREVIEW]
+    return {
+        "memory_id": m["memory_id"],
+        "type": m["memory_type"],
+        "title": m["title"],
+        "body": preview + "..." if len(body) > BODY_PREVIEW else preview,
+        "tags": m["tags"],
+        "importance": m["importance"],
+        "pinned": bool(m["pin_status"]),
+        "created_at": m["created_at"],
+    }
+
+
+@functools.lru_cache(maxsize=64)
+def _rrf_weights(n: int, k: int) -> Tuple[float, ...]:
+    """RRF contribution of ranks 1..n."""
+    return tuple(1.0 / (k + rank) for rank in range(1, n + 1))
+
+
+def _rrf_fuse(rankings: List[List[str]], top_k: int, k: int = RRF_K) -> List[tuple]:
+    """Fuse ranked id lists with RRF; returns [(id, score)] best first."""
+    scores: Dict[str, float] = {}
+    get = scores.get
+    for ranking in rankings:
+        # 1/(k+rank) depends only on position; compute it once per rank
+        for doc_id, weight in zip(ranking, _rrf_weights(len(ranking), k)):
+            scores[doc_id] = get(doc_id, 0.0) + weight
+    # Partial selection instead of sorting every candidate
+    return heapq.nlargest(top_k, scores.items(), key=itemgetter(1))
 
 
 def run(action: str, **kwargs) -> Dict:
@@ -32,7 +77,7 @@ def run(action: str, **kwargs) -> Dict:
     Actions:
         - write: Store a new memory (body, title, memory_type, tags, importance, pin)
         - query: Search memories by text/tags/type (query, memory_type, tags, min_importance)
-        - semantic: Semantic search via embeddings (query, top_k)
+        - semantic: Hybrid keyword + embedding search, fused by rank (query, top_k)
         - pin: Pin a memory to prevent expiration (memory_id)
         - update: Update a memory (memory_id, + any fields to change)
         - delete: Delete a memory (memory_id)
@@ -42,7 +87,7 @@ def run(action: str, **kwargs) -> Dict:
         if action == "write":
             body = kwargs.get("body", "")
             if not body:
-                return {"success": False, "error": "body is required"}
+                return _ERR_NO_BODY
 
             mem_id = store_memory(
                 body=body,
@@ -56,7 +101,8 @@ def run(action: str, **kwargs) -> Dict:
                 expires_at=kwargs.get("expires_at"),
             )
 
-            # Also embed in vector store if available
+            # Also embed in vector store if available; queued and embedded in
+            # batches so the write returns without waiting on the API
             vs = _get_vectors()
             if vs:
                 text_to_embed = f"{kwargs.get('title', '')} {body}".strip()
@@ -65,7 +111,7 @@ def run(action: str, **kwargs) -> Dict:
                     "tags": kwargs.get("tags", ""),
                     "importance": str(kwargs.get("importance", 3)),
                 }
-                vs.store(mem_id, text_to_embed, metadata=meta)
+                vs.store(mem_id, text_to_embed, metadata=meta, defer=True)
 
             return {"success": True, "memory_id": mem_id, "message": f"Memory stored: {mem_id}"}
 
@@ -80,86 +126,85 @@ def run(action: str, **kwargs) -> Dict:
             return {
                 "success": True,
                 "count": len(results),
-                "memories": [
-                    {
-                        "memory_id": m["memory_id"],
-                        "type": m["memory_type"],
-                        "title": m.get("title"),
-                        "body": m["body"][:300] + ("..." if len(m["body"]) > 300 else ""),
-                        "tags": m.get("tags"),
-                        "importance": m["importance"],
-                        "pinned": bool(m["pin_status"]),
-                        "created_at": m["created_at"],
-                    }
-                    for m in results
-                ]
+                "memories": [_project_memory(m) for m in results],
             }
 
         elif action == "semantic":
             query = kwargs.get("query", "")
             if not query:
-                return {"success": False, "error": "query is required for semantic search"}
+                return _ERR_NO_QUERY
 
+            # Hybrid: BM25 keyword ranking and vector similarity, fused by RRF
+            top_k = kwargs.get("top_k", 5)
+            fetch = top_k * 3
             vs = _get_vectors()
-            if not vs:
-                # Fallback to keyword search
-                results = search_memories(query=query, limit=kwargs.get("top_k", 5))
-                return {
-                    "success": True,
-                    "method": "keyword_fallback",
-                    "count": len(results),
-                    "memories": [
-                        {
-                            "memory_id": m["memory_id"],
-                            "type": m["memory_type"],
-                            "title": m.get("title"),
-                            "body": m["body"][:300],
-                            "score": None,
-                        }
-                        for m in results
-                    ]
-                }
+            keyword_future = _SEARCH_POOL.submit(rank_memories, query, fetch)
+            vec_results = []
+            if vs:
+                vs.flush()  # writes queued for batch embedding must be searchable
+                vec_results = vs.search(query, top_k=fetch)
+            keyword_results = keyword_future.result()
 
-            vec_results = vs.search(
-                query=query,
-                top_k=kwargs.get("top_k", 5),
-            )
+            keyword_by_id = {m["memory_id"]: m for m in keyword_results}
+            vec_by_id = {r["memory_id"]: r for r in vec_results}
+            fused = _rrf_fuse([list(keyword_by_id), list(vec_by_id)], top_k)
+            # Only the fused top_k are projected into the response
+            memories = []
+            for doc_id, score in fused:
+                r = vec_by_id.get(doc_id)
+                similarity = round(r["score"], 4) if r is not None else None
+                m = keyword_by_id.get(doc_id)
+                if m is not None:
+                    title = m["title"]
+                    body = m["body"][:BODY_PREVIEW]
+                    memories.append({
+                        "memory_id": doc_id,
+                        "text": (f"{title} {body}" if title else body)[:BODY_PREVIEW],
+                        "metadata": {
+                            "memory_type": m["memory_type"],
+                            "tags": m["tags"] or "",
+                            "importance": str(m["importance"]),
+                        },
+                        "rrf_score": round(score, 4),
+                        "similarity": similarity,
+                    })
+                else:
+                    memories.append({
+                        "memory_id": doc_id,
+                        "text": r["text"][:BODY_PREVIEW],
+                        "metadata": r["metadata"],
+                        "rrf_score": round(score, 4),
+                        "similarity": similarity,
+                    })
             return {
                 "success": True,
-                "method": "semantic",
-                "count": len(vec_results),
-                "memories": [
-                    {
-                        "memory_id": r["memory_id"],
-                        "text": r["text"][:300],
-                        "score": round(r["score"], 3),
-                        "metadata": r["metadata"],
-                    }
-                    for r in vec_results
-                ]
+                "method": "hybrid" if vec_results else "keyword_fallback",
+                "count": len(memories),
+                "memories": memories,
             }
 
         elif action == "pin":
             mem_id = kwargs.get("memory_id", "")
             if not mem_id:
-                return {"success": False, "error": "memory_id is required"}
+                return _ERR_NO_MEMORY_ID
             pinned = pin_memory(mem_id)
             return {"success": pinned, "message": f"Memory {mem_id} {'pinned' if pinned else 'not found'}"}
 
         elif action == "update":
             mem_id = kwargs.get("memory_id", "")
             if not mem_id:
-                return {"success": False, "error": "memory_id is required"}
+                return _ERR_NO_MEMORY_ID
             updated = update_memory(mem_id, **{k: v for k, v in kwargs.items() if k != "memory_id"})
             return {"success": updated, "message": f"Memory {mem_id} {'updated' if updated else 'not found or no changes'}"}
 
         elif action == "delete":
             mem_id = kwargs.get("memory_id", "")
             if not mem_id:
-                return {"success": False, "error": "memory_id is required"}
+                return _ERR_NO_MEMORY_ID
             # Delete from vector store too
             vs = _get_vectors()
             if vs:
+                vs.flush()  # a still-queued embed would re-add the vector after delete
                 vs.delete(mem_id)
             deleted = delete_memory(mem_id)
             return {"success": deleted, "message": f"Memory {mem_id} {'deleted' if deleted else 'not found'}"}
@@ -179,7 +224,7 @@ def run(action: str, **kwargs) -> Dict:
 
 TOOL_DEF = {
     "name": "memory",
-    "description": "Manage Jarvis's long-term memory. Actions: write (store fact/note/preference/runbook), query (keyword search by text/type/tags/importance), semantic (AI-powered similarity search), pin (make permanent), update (change fields), delete (remove), stats (overview).",
+    "description": "Manage Jarvis's long-term memory. Actions: write (store fact/note/preference/runbook), query (keyword search by text/type/tags/importance), semantic (AI-powered similarity search blended with keyword relevance), pin (make permanent), update (change fields), delete (remove), stats (overview).",
     "parameters": {
         "type": "object",
         "properties": {
@@ -6,37 +6,36 @@ memory_items with memory_type='note'.
 
 from __future__ import annotations
 
+from types import MappingProxyType
 from typing import Dict, List, Optional
 
 from memory.memory import store_memory, search_memories, delete_memory
 
 
+# Fixed error results, shared and read-only
+_ERR_NO_TEXT = MappingProxyType({"success": False, "error": "text is required"})
+_ERR_NO_NOTE_ID = MappingProxyType({"success": False, "error": "note_id is required"})
+
+
 def run(action: str = "list", text: str = None, query: str = None, tags: str = None, limit: int = 10, note_id: str = None) -> Dict:
     try:
         action = (action or "list").lower()
 
         if action in ("add", "write", "create"):
             if not text:
-                return {"success": False, "error": "text is required"}
+                return _ERR_NO_TEXT
             mem_id = store_memory(body=text, memory_type="note", tags=tags, source="user")
             return {"success": True, "message": f"Note saved as {mem_id}", "id": mem_id}
 
         if action in ("list", "search", "find"):
             q = query if action != "list" else None
-            results = search_memories(query=q, memory_type="note", tags=tags, limit=limit)
-            notes = []
-            for r in results:
-                notes.append({
-                    "id": r["memory_id"],
-                    "text": r["body"],
-                    "tags": (r.get("tags") or "").split(",") if r.get("tags") else [],
-                    "created_at": r.get("created_at"),
-                })
+            notes = search_memories(query=q, memory_type="note", tags=tags,
+                                    limit=limit, as_note_rows=True)
             return {"success": True, "count": len(notes), "notes": notes}
 
         if action in ("delete", "remove"):
             if not note_id:
-                return {"success": False, "error": "note_id is required"}
+                return _ERR_NO_NOTE_ID
             ok = delete_memory(note_id)
             return {"success": ok, "message": f"Note {note_id} {'deleted' if ok else 'not found'}"}
 
@@ -10,21 +10,20 @@ This does NOT connect to Saviynt; it generates artifacts.
 
 from __future__ import annotations
 
-import os
 import json
-from typing import Dict
+import string
+from types import MappingProxyType
+from typing import Callable, Dict, List, Optional, Tuple
 
-import yaml
+from tools._policy_cache import load_policies
 
-POLICIES_PATH = os.path.join(os.path.dirname(__file__), "..", "configs", "policies.yaml")
+
+# Fixed error results, shared and read-only
+_ERR_NO_TEMPLATE = MappingProxyType({"success": False, "error": "template is required"})
 
 
 def _load_cfg() -> Dict:
-    try:
-        with open(POLICIES_PATH, "r") as f:
-            return yaml.safe_load(f) or {}
-    except Exception:
-        return {}
+    return load_policies()
 
 
 def _templates() -> Dict[str, str]:
@@ -32,30 +31,92 @@ def _templates() -> Dict[str, str]:
     return (cfg.get("saviynt", {}) or {}).get("query_templates", {}) or {}
 
 
+# (templates dict the previews were built from, previews). The policy cache
+# hands back the same dict until policies.yaml changes, so identity is the
+# invalidation check.
+_previews_cache: Tuple[Optional[Dict], List[Dict]] = (None, [])
+
+
+def _templates_previews() -> List[Dict]:
+    global _previews_cache
+    ts = _templates()
+    source, previews = _previews_cache
+    if source is not ts:
+        previews = [{"name": k, "preview": (v.strip().splitlines()[0] if v else "")}
+                    for k, v in ts.items()]
+        _previews_cache = (ts, previews)
+    return previews
+
+
+_FORMATTER = string.Formatter()
+
+
+def _compile_template(raw: str) -> Callable[[Dict], str]:
+    """
+    Renderer for raw.format(**params) that falls back to the raw text on any
+    error. The template is parsed once; plain {name} fields then render with
+    one dict lookup each instead of str.format re-parsing the whole string.
+    """
+    def render_with_format(params: Dict) -> str:
+        try:
+            return raw.format(**params)
+        except Exception:
+            return raw
+
+    try:
+        parsed = list(_FORMATTER.parse(raw))
+    except ValueError:
+        return lambda params: raw  # malformed braces: format would always fail
+    pieces = []
+    for literal, field, spec, conversion in parsed:
+        if field is not None and not (field.isidentifier() and not spec and not conversion):
+            # Indexed/positional fields, format specs or conversions
+            return render_with_format
+        pieces.append((literal, field))
+
+    def render(params: Dict) -> str:
+        try:
+            return "".join(literal if field is None else literal + format(params[field])
+                           for literal, field in pieces)
+        except Exception:
+            return raw
+    return render
+
+
+# (templates dict the renderers were built from, name -> renderer); same
+# identity check as _previews_cache
+_compiled_cache: Tuple[Optional[Dict], Dict[str, Callable[[Dict], str]]] = (None, {})
+
+
+def _compiled_templates() -> Dict[str, Callable[[Dict], str]]:
+    global _compiled_cache
+    ts = _templates()
+    source, compiled = _compiled_cache
+    if source is not ts:
+        compiled = {name: _compile_template(raw or "") for name, raw in ts.items()}
+        _compiled_cache = (ts, compiled)
+    return compiled
+
+
 def run(action: str = "templates", template: str = None, params: Dict = None, purpose: str = None) -> Dict:
     try:
         action = (action or "templates").lower()
         params = params or {}
 
         if action in ("templates", "list"):
-            ts = _templates()
             return {
                 "success": True,
-                "templates": [{"name": k, "preview": (v.strip().splitlines()[0] if v else "")} for k, v in ts.items()],
+                "templates": _templates_previews(),
             }
 
         if action in ("query", "generate_query"):
-            ts = _templates()
+            compiled = _compiled_templates()
             if not template:
-                return {"success": False, "error": "template is required"}
-            if template not in ts:
+                return _ERR_NO_TEMPLATE
+            if template not in compiled:
                 return {"success": False, "error": f"unknown template: {template}"}
-            raw = ts[template]
             # Best-effort safe formatting
-            try:
-                rendered = raw.format(**params)
-            except Exception:
-                rendered = raw
+            rendered = compiled[template](params)
             return {
                 "success": True,
                 "template": template,
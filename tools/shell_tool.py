@@ -10,22 +10,53 @@ This is intentionally conservative.
 from __future__ import annotations
 
 import os
+import re
 import shlex
 import subprocess
-from typing import Dict
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, List, Optional, Pattern, Tuple
 
-import yaml
+from tools._policy_cache import get_policy_section
 
-POLICIES_PATH = os.path.join(os.path.dirname(__file__), "..", "configs", "policies.yaml")
+
+# Fixed error results, shared and read-only
+_ERR_DISABLED = MappingProxyType({"success": False, "error": "shell tool is disabled by policy"})
+
+
+# Without quotes, escapes or expansions, shlex.split() is a plain split on
+# its whitespace characters, which the regex below does in C
+_SHLEX_SPECIAL = re.compile(r"[\"'\\`$]")
+_SHLEX_WORDS = re.compile(r"[^ \t\r\n]+")
+
+OUTPUT_CAP = 8000      # chars of stdout/stderr kept per command
+_READ_CHUNK = 65536    # pipe buffer and discard-read size past the cap
+
+# (policy dict it was built from, compiled policy). The policy cache hands
+# back the same dict until policies.yaml changes, so identity is the
+# invalidation check.
+_compiled_cache: Tuple[Optional[Dict], Dict] = (None, {})
 
 
 def _load_shell_policy() -> Dict:
-    try:
-        with open(POLICIES_PATH, "r") as f:
-            cfg = yaml.safe_load(f) or {}
-        return cfg.get("shell", {})
-    except Exception:
-        return {}
+    """
+    The shell section, prepared for per-command checks:
+    {"enabled": bool, "allowed": frozenset of binaries,
+     "blocked": one regex alternation of blocked patterns, or None}
+    """
+    global _compiled_cache
+    policy = get_policy_section("shell")
+    source, compiled = _compiled_cache
+    if source is not policy:
+        blocked = [pat for pat in policy.get("blocked_patterns", []) or [] if pat]
+        compiled = {
+            "enabled": bool(policy.get("enabled", True)),
+            "allowed": frozenset(policy.get("allowed_commands", []) or []),
+            "blocked": re.compile("|".join(map(re.escape, blocked))) if blocked else None,
+        }
+        _compiled_cache = (policy, compiled)
+    return compiled
 
 
 def _is_allowed(command: str, policy: Dict) -> (bool, str):
@@ -33,48 +64,90 @@ def _is_allowed(command: str, policy: Dict) -> (bool, str):
     if not cmd:
         return False, "command is empty"
 
-    blocked = policy.get("blocked_patterns", []) or []
-    for pat in blocked:
-        if pat and pat in cmd:
-            return False, f"blocked pattern detected: {pat}"
+    blocked: Optional[Pattern] = policy["blocked"]
+    match = blocked.search(cmd) if blocked else None
+    if match:
+        return False, f"blocked pattern detected: {match.group(0)}"
 
-    try:
-        parts = shlex.split(cmd)
-    except Exception:
-        return False, "failed to parse command"
+    if _SHLEX_SPECIAL.search(cmd) is None:
+        parts = _SHLEX_WORDS.findall(cmd)
+    else:
+        try:
+            parts = shlex.split(cmd)
+        except Exception:
+            return False, "failed to parse command"
 
     binary = parts[0] if parts else ""
-    allowed = set(policy.get("allowed_commands", []) or [])
-    if binary not in allowed:
+    if binary not in policy["allowed"]:
         return False, f"'{binary}' is not in allowlist"
 
     return True, "ok"
 
 
+def _read_capped(stream, out: List[str]):
+    """
+    Keep the first OUTPUT_CAP chars of a pipe and discard the rest as it
+    arrives, so memory stays bounded and the child never blocks on a full
+    pipe (killing it early would lose its exit status).
+    """
+    try:
+        out.append(stream.read(OUTPUT_CAP))
+        while stream.read(_READ_CHUNK):
+            pass
+    except OSError:
+        pass  # pipe broke under us after a kill
+    except ValueError:
+        if not stream.closed:  # only "I/O operation on closed file" is expected
+            raise
+
+
 def run(command: str, timeout_s: int = 8) -> Dict:
     policy = _load_shell_policy()
-    if not policy.get("enabled", True):
-        return {"success": False, "error": "shell tool is disabled by policy"}
+    if not policy["enabled"]:
+        return _ERR_DISABLED
 
     ok, reason = _is_allowed(command, policy)
     if not ok:
         return {"success": False, "error": reason}
 
     try:
-        proc = subprocess.run(
+        proc = subprocess.Popen(
             command,
             shell=True,
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             text=True,
-            timeout=timeout_s,
+            errors="replace",  # undecodable bytes must not stop the drain
+            bufsize=_READ_CHUNK,
             cwd=os.getcwd(),
         )
+        deadline = time.monotonic() + timeout_s
+        out: List[str] = []
+        err: List[str] = []
+        readers = [
+            threading.Thread(target=_read_capped, args=(proc.stdout, out), daemon=True),
+            threading.Thread(target=_read_capped, args=(proc.stderr, err), daemon=True),
+        ]
+        for reader in readers:
+            reader.start()
+        try:
+            proc.wait(timeout=timeout_s)
+            for reader in readers:
+                reader.join(max(0.0, deadline - time.monotonic()))
+            if any(reader.is_alive() for reader in readers):
+                # a background grandchild still holds the pipes open
+                raise subprocess.TimeoutExpired(command, timeout_s)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+            raise
+        stdout, stderr = "".join(out), "".join(err)
         return {
             "success": proc.returncode == 0,
             "returncode": proc.returncode,
-            "output": (proc.stdout or "")[:8000],
-            "stderr": (proc.stderr or "")[:8000],
-            "error": "" if proc.returncode == 0 else (proc.stderr or "command failed")[:4000],
+            "output": stdout,
+            "stderr": stderr,
+            "error": "" if proc.returncode == 0 else (stderr or "command failed")[:4000],
         }
     except subprocess.TimeoutExpired:
         return {"success": False, "error": f"command timed out after {timeout_s}s"}
@@ -4,6 +4,7 @@ Enhanced feedback, skill management, and improvement analysis.
 """
 
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional
 from memory.memory import (
     add_feedback, get_feedback_summary, get_tool_run_stats,
@@ -11,10 +12,25 @@ from memory.memory import (
     get_all_preferences, DEFAULT_USER
 )
 
+# Runs the vector-store half of stats() while the caller reads SQLite
+_STATS_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jarvis-stats")
+
 
 class Trainer:
     """Manages learning from user feedback and building the skills library."""
 
+    @property
+    def vs(self):
+        """The shared vector store; None if it can't be created."""
+        from memory.vectors import get_vector_store
+        return get_vector_store()
+
+    def _vector_stats(self) -> Dict:
+        try:
+            return self.vs.stats() if self.vs else {"available": False}
+        except Exception:
+            return {"available": False}
+
     def rate(self, conversation_id: str, rating: int,
              message_id: str = None, tool_run_id: str = None,
              correction: str = None, label: str = None) -> Dict:
@@ -31,19 +47,14 @@ class Trainer:
         return {"success": True, "feedback_id": fb_id, "message": f"Feedback recorded: {'⭐' * rating}"}
 
     def stats(self) -> Dict:
+        # The vector store may be slow to open; the SQLite reads share this
+        # thread's connection and are cheap enough to run one after another
+        vec_future = _STATS_POOL.submit(self._vector_stats)
         tool_stats = get_tool_run_stats()
         fb_summary = get_feedback_summary()
         mem_stats = get_memory_stats()
         skills = get_skills()
-
-        # Vector store stats
-        vec_stats = {"available": False}
-        try:
-            from memory.vectors import VectorStore
-            vs = VectorStore()
-            vec_stats = vs.stats()
-        except Exception:
-            pass
+        vec_stats = vec_future.result()
 
         return {
             "tools": tool_stats,